@@ -0,0 +1,57 @@
+"""
+Shared connection pool for the standalone check/verify scripts
+
+Opening a connection costs a DNS lookup, TCP (and TLS) handshake, auth and
+backend startup; scripts get one pool per event loop instead and reuse its
+connections for every query.
+
+Usage:
+    from db.connect import get_pool, close_pool
+
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        ...
+    await close_pool()  # before the event loop ends
+"""
+import asyncio
+import asyncpg
+from db.config import DB_CONFIG
+
+# Pools are bound to the loop that created them (asyncio.run() makes a new
+# one each call), so they are memoized per loop. The creation task is what's
+# cached, so callers that arrive while it is still connecting (e.g. several
+# verify() calls under asyncio.gather) all await the same pool.
+_pool_tasks = {}
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Return the pool for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    task = _pool_tasks.get(loop)
+    if task is None:
+        task = loop.create_task(asyncpg.create_pool(
+            **DB_CONFIG,
+            min_size=1,
+            max_size=4,
+            statement_cache_size=512
+        ))
+        _pool_tasks[loop] = task
+    try:
+        return await task
+    except Exception:
+        # Let the next call retry instead of re-raising a cached failure
+        if _pool_tasks.get(loop) is task:
+            del _pool_tasks[loop]
+        raise
+
+
+async def close_pool():
+    """Close the running event loop's pool, if one was opened"""
+    task = _pool_tasks.pop(asyncio.get_running_loop(), None)
+    if task is None:
+        return
+    try:
+        pool = await task
+    except Exception:
+        return
+    await pool.close()
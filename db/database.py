@@ -1,7 +1,30 @@
 import asyncpg
+import logging
+import sys
 from typing import Dict, Optional
 import uuid
 
+# Output goes to stdout like print(); scraper/run.py moves it onto its log
+# queue so it stays in order with the scraper's progress lines
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+if not log.handlers:
+    _log_stream = logging.StreamHandler(sys.stdout)
+    _log_stream.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_log_stream)
+
+
+# Columns written for each property snapshot, in record order
+PROPERTY_COLUMNS = [
+    'id', 'property_id', 'town_id', 'offer_type_id', 'property_type_id', 'status_id', 'county_id',
+    'address_id', 'postcode_id', 'url', 'price',
+    'address_line1', 'locality', 'full_address',
+    'latitude', 'longitude',
+    'bedrooms', 'bathrooms', 'description',
+    'added_on', 'reduced_on', 'size', 'tenure_id', 'council_tax_band'
+]
+
 
 class DatabaseConnector:
     def __init__(self):
@@ -26,13 +49,13 @@ class DatabaseConnector:
             max_size=10,
             ssl=False  # Disable SSL requirement for local connections
         )
-        print(f"[OK] Connected to PostgreSQL database: {database}")
+        log.info(f"[OK] Connected to PostgreSQL database: {database}")
 
     async def disconnect(self):
         """Close the connection pool"""
         if self.pool:
             await self.pool.close()
-            print("[OK] Disconnected from database")
+            log.info("[OK] Disconnected from database")
 
     async def init_schema(self):
         """Create the properties, towns, offer_types, and hierarchical places tables if they don't exist"""
@@ -155,10 +178,18 @@ class DatabaseConnector:
                     tenure_id INTEGER REFERENCES tenure_types(id),
                     council_tax_band VARCHAR(10),
                     minio_images JSONB,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_seen_at TIMESTAMP
                 )
             """)
 
+            # When the scraper last found the listing unchanged (set on the
+            # latest snapshot; NULL means "as of created_at"). Nullable with
+            # no default, so adding it to an existing table is instant
+            await conn.execute("""
+                ALTER TABLE properties ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP
+            """)
+
             # Create indices for faster queries
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_properties_property_id
@@ -170,6 +201,19 @@ class DatabaseConnector:
                 ON properties(town_id)
             """)
 
+            # Covering index for per-town distinct property counts
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_properties_town_id_property_id
+                ON properties(town_id, property_id)
+            """)
+
+            # Covering index for has_changes(): the duplicate-snapshot check
+            # is answered by an index-only probe
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_properties_dedup
+                ON properties(property_id, price, status_id, offer_type_id, reduced_on)
+            """)
+
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_properties_created_at
                 ON properties(created_at)
@@ -225,6 +269,11 @@ class DatabaseConnector:
                 ON places(name)
             """)
 
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_places_name_type
+                ON places(name, place_type)
+            """)
+
             # Create indices for addresses table
             await conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_addresses_place_id
@@ -260,7 +309,7 @@ class DatabaseConnector:
                 ON counties(name)
             """)
 
-            print("[OK] Database schema initialized (snapshot mode with hierarchical places including postcodes, normalized towns, offer types, property types, statuses, counties, and coordinates)")
+            log.info("[OK] Database schema initialized (snapshot mode with hierarchical places including postcodes, normalized towns, offer types, property types, statuses, counties, and coordinates)")
 
     async def get_or_create_town(self, town_name: str) -> int:
         """Get town ID, creating it if it doesn't exist"""
@@ -279,7 +328,7 @@ class DatabaseConnector:
                 "INSERT INTO towns (name) VALUES ($1) RETURNING id",
                 town_name
             )
-            print(f"[NEW TOWN] Created: {town_name} (ID: {town_id})")
+            log.info(f"[NEW TOWN] Created: {town_name} (ID: {town_id})")
             return town_id
 
     async def get_or_create_offer_type(self, offer_type_name: str) -> Optional[int]:
@@ -302,7 +351,7 @@ class DatabaseConnector:
                 "INSERT INTO offer_types (name) VALUES ($1) RETURNING id",
                 offer_type_name
             )
-            print(f"[NEW OFFER TYPE] Created: {offer_type_name} (ID: {offer_type_id})")
+            log.info(f"[NEW OFFER TYPE] Created: {offer_type_name} (ID: {offer_type_id})")
             return offer_type_id
 
     async def get_or_create_property_type(self, property_type_name: str) -> Optional[int]:
@@ -325,7 +374,7 @@ class DatabaseConnector:
                 "INSERT INTO property_types (name) VALUES ($1) RETURNING id",
                 property_type_name
             )
-            print(f"[NEW PROPERTY TYPE] Created: {property_type_name} (ID: {property_type_id})")
+            log.info(f"[NEW PROPERTY TYPE] Created: {property_type_name} (ID: {property_type_id})")
             return property_type_id
 
     async def get_or_create_status(self, status_name: str) -> Optional[int]:
@@ -348,7 +397,7 @@ class DatabaseConnector:
                 "INSERT INTO statuses (name) VALUES ($1) RETURNING id",
                 status_name
             )
-            print(f"[NEW STATUS] Created: {status_name} (ID: {status_id})")
+            log.info(f"[NEW STATUS] Created: {status_name} (ID: {status_id})")
             return status_id
 
     async def get_or_create_tenure_type(self, tenure_name: str) -> Optional[int]:
@@ -371,7 +420,7 @@ class DatabaseConnector:
                 "INSERT INTO tenure_types (name) VALUES ($1) RETURNING id",
                 tenure_name
             )
-            print(f"[NEW TENURE TYPE] Created: {tenure_name} (ID: {tenure_type_id})")
+            log.info(f"[NEW TENURE TYPE] Created: {tenure_name} (ID: {tenure_type_id})")
             return tenure_type_id
 
     async def get_or_create_county(self, county_name: str) -> Optional[int]:
@@ -394,7 +443,7 @@ class DatabaseConnector:
                 "INSERT INTO counties (name) VALUES ($1) RETURNING id",
                 county_name
             )
-            print(f"[NEW COUNTY] Created: {county_name} (ID: {county_id})")
+            log.info(f"[NEW COUNTY] Created: {county_name} (ID: {county_id})")
             return county_id
 
     async def get_or_create_postcode(self, postcode: str) -> Optional[int]:
@@ -420,7 +469,7 @@ class DatabaseConnector:
                 "INSERT INTO postcodes (postcode) VALUES ($1) RETURNING id",
                 postcode
             )
-            print(f"[NEW POSTCODE] Created: {postcode} (ID: {postcode_id})")
+            log.info(f"[NEW POSTCODE] Created: {postcode} (ID: {postcode_id})")
             return postcode_id
 
     async def get_or_create_place(
@@ -462,7 +511,7 @@ class DatabaseConnector:
                 place_type,
                 parent_id
             )
-            print(f"[NEW PLACE] Created: {name} ({place_type}, parent_id={parent_id}) (ID: {place_id})")
+            log.info(f"[NEW PLACE] Created: {name} ({place_type}, parent_id={parent_id}) (ID: {place_id})")
             return place_id
 
     async def get_or_create_hierarchical_place(
@@ -564,7 +613,7 @@ class DatabaseConnector:
                 postcode_id,
                 display_address
             )
-            print(f"[NEW ADDRESS] Created: {building or 'N/A'} (place_id={place_id}, postcode_id={postcode_id}) (ID: {address_id})")
+            log.info(f"[NEW ADDRESS] Created: {building or 'N/A'} (place_id={place_id}, postcode_id={postcode_id}) (ID: {address_id})")
             return address_id
 
     async def get_latest_snapshot(self, property_id: str) -> Optional[Dict]:
@@ -582,7 +631,7 @@ class DatabaseConnector:
             """, property_id)
             return dict(row) if row else None
 
-    async def has_changes(self, property_id: str, new_data: Dict) -> bool:
+    async def has_changes(self, property_id: str, new_data: Dict, conn=None) -> bool:
         """
         Check if the new data differs from ALL existing snapshots
 
@@ -590,51 +639,150 @@ class DatabaseConnector:
         This prevents saving duplicate snapshots that differ only in creation date.
 
         Tracks changes in critical fields: price, offer_type_id, status_id, reduced_on
+
+        Pass conn to read on a specific connection (e.g. one inside an open
+        transaction); otherwise a pooled connection is used.
         """
-        async with self.pool.acquire() as conn:
-            # Get ALL existing snapshots for this property (not just latest)
-            existing_snapshots = await conn.fetch("""
-                SELECT property_id, price, status_id, offer_type_id, reduced_on
+        # Let PostgreSQL look for an identical snapshot (any in history) and
+        # stop at the first match, rather than shipping every snapshot back
+        query = """
+            SELECT EXISTS(
+                SELECT 1
                 FROM properties
                 WHERE property_id = $1
-                ORDER BY created_at ASC
-            """, property_id)
+                  AND price IS NOT DISTINCT FROM $2::bigint
+                  AND status_id IS NOT DISTINCT FROM $3::int
+                  AND offer_type_id IS NOT DISTINCT FROM $4::int
+                  AND reduced_on IS NOT DISTINCT FROM $5::varchar
+            )
+        """
+        args = (
+            property_id,
+            new_data.get('price'),
+            new_data.get('status_id'),
+            new_data.get('offer_type_id'),
+            new_data.get('reduced_on'),
+        )
+        if conn is not None:
+            duplicate = await conn.fetchval(query, *args)
+        else:
+            async with self.pool.acquire() as conn:
+                duplicate = await conn.fetchval(query, *args)
 
-        if not existing_snapshots:
-            # No previous snapshot, this is a new property
-            return True
+        if duplicate:
+            # Found identical snapshot - no need to insert duplicate
+            log.info(f"[SKIP] {property_id} - identical snapshot already exists (created earlier)")
+            return False
+
+        # New property, or data differs from every snapshot
+        self._log_change(property_id, new_data)
+        return True
 
-        # Check if any existing snapshot has identical data
-        # If we find an identical snapshot, return False (no changes needed)
-        for snapshot in existing_snapshots:
-            # Compare critical fields
-            if (snapshot.get('price') == new_data.get('price') and
-                snapshot.get('offer_type_id') == new_data.get('offer_type_id') and
-                snapshot.get('status_id') == new_data.get('status_id') and
-                snapshot.get('reduced_on') == new_data.get('reduced_on')):
+    @staticmethod
+    def _log_change(property_id: str, data: Dict):
+        """Log that a property's tracked fields match none of its snapshots"""
+        log.info(f"[CHANGE] {property_id} - no identical snapshot (price £{data.get('price')}, "
+              f"status_id {data.get('status_id')}, offer_type_id {data.get('offer_type_id')}, "
+              f"reduced_on {data.get('reduced_on')})")
 
-                # Found identical snapshot - no need to insert duplicate
-                print(f"[SKIP] {property_id} - identical snapshot already exists (created earlier)")
-                return False
+    async def _resolve_lookup_ids(self, data: Dict):
+        """Get or create the offer type, property type, status and tenure IDs and add them to data"""
+        # Get or create offer type (if present)
+        price_qualifier = data.get("price_qualifier")
+        data["offer_type_id"] = await self.get_or_create_offer_type(price_qualifier)
 
-        # No identical snapshot found - data has changed
-        # Get latest snapshot to show what changed
-        latest = existing_snapshots[-1]  # Last one (most recent)
+        # Get or create property type
+        property_type_name = data.get("property_type")
+        data["property_type_id"] = await self.get_or_create_property_type(property_type_name)
 
-        # Log what changed
-        if latest.get('price') != new_data.get('price'):
-            print(f"[CHANGE] {property_id} - price: £{latest.get('price')} -> £{new_data.get('price')}")
+        # Get or create status
+        status_name = data.get("status")
+        data["status_id"] = await self.get_or_create_status(status_name)
 
-        if latest.get('offer_type_id') != new_data.get('offer_type_id'):
-            print(f"[CHANGE] {property_id} - offer_type_id: {latest.get('offer_type_id')} -> {new_data.get('offer_type_id')}")
+        # Get or create tenure type
+        tenure_name = data.get("tenure")
+        data["tenure_id"] = await self.get_or_create_tenure_type(tenure_name)
 
-        if latest.get('status_id') != new_data.get('status_id'):
-            print(f"[CHANGE] {property_id} - status_id: {latest.get('status_id')} -> {new_data.get('status_id')}")
+    async def _build_property_record(self, data: Dict, town_id: int, town_name: str) -> tuple:
+        """
+        Resolve the place/address hierarchy for a property and build its row
 
-        if latest.get('reduced_on') != new_data.get('reduced_on'):
-            print(f"[CHANGE] {property_id} - reduced_on: {latest.get('reduced_on')} -> {new_data.get('reduced_on')}")
+        Returns:
+            Tuple of values in PROPERTY_COLUMNS order
+        """
+        # Parse address components
+        address_parts = data.get("address_parts", {})
+
+        # Get coordinates
+        coordinates = data.get("coordinates", {})
+
+        # NEW: Create hierarchical address structure
+        # Extract geographic data (from reverse geocoding)
+        county = address_parts.get("county")
+        locality = address_parts.get("locality")
+        postcode_value = address_parts.get("postcode")
+        address_line1 = address_parts.get("line1")
+        full_address = data.get("full_address")
+
+        # Get or create county
+        county_id = await self.get_or_create_county(county)
+
+        # Create hierarchical places (county -> town -> locality -> postcode)
+        # This creates all levels and returns the most specific (postcode if provided)
+        most_specific_place_id = await self.get_or_create_hierarchical_place(
+            county=county,
+            town=town_name,
+            locality=locality,
+            postcode=postcode_value
+        )
 
-        return True
+        # For address, we want to reference the locality (not postcode)
+        # Create hierarchy without postcode to get locality_id
+        locality_place_id = await self.get_or_create_hierarchical_place(
+            county=county,
+            town=town_name,
+            locality=locality,
+            postcode=None
+        )
+
+        # Create postcode in postcodes table (for backward compatibility)
+        postcode_id = await self.get_or_create_postcode(postcode_value) if postcode_value else None
+
+        # Create address (references locality, not postcode)
+        address_id = await self.get_or_create_address(
+            building=address_line1,
+            street=None,
+            place_id=locality_place_id,
+            postcode_id=postcode_id,
+            display_address=full_address
+        )
+
+        return (
+            uuid.uuid4(),
+            data.get("property_id"),
+            town_id,
+            data.get("offer_type_id"),
+            data.get("property_type_id"),
+            data.get("status_id"),
+            county_id,
+            address_id,
+            postcode_id,
+            data.get("url"),
+            data.get("price"),
+            address_parts.get("line1"),
+            locality,
+            data.get("full_address"),
+            coordinates.get("latitude"),
+            coordinates.get("longitude"),
+            data.get("bedrooms"),
+            data.get("bathrooms"),
+            data.get("description"),
+            data.get("added_on"),
+            data.get("reduced_on"),
+            data.get("size"),
+            data.get("tenure_id"),
+            data.get("council_tax_band")
+        )
 
     async def insert_property(self, data: Dict, town_name: str) -> tuple[bool, str]:
         """
@@ -654,122 +802,155 @@ class DatabaseConnector:
             # Get or create town (backward compatibility)
             town_id = await self.get_or_create_town(town_name)
 
-            # Get or create offer type (if present)
-            price_qualifier = data.get("price_qualifier")
-            offer_type_id = await self.get_or_create_offer_type(price_qualifier)
-
-            # Get or create property type
-            property_type_name = data.get("property_type")
-            property_type_id = await self.get_or_create_property_type(property_type_name)
-
-            # Get or create status
-            status_name = data.get("status")
-            status_id = await self.get_or_create_status(status_name)
-
-            # Get or create tenure type
-            tenure_name = data.get("tenure")
-            tenure_type_id = await self.get_or_create_tenure_type(tenure_name)
-
-            # Add IDs to data for comparison
-            data["offer_type_id"] = offer_type_id
-            data["property_type_id"] = property_type_id
-            data["status_id"] = status_id
-            data["tenure_id"] = tenure_type_id
+            # Add lookup IDs to data for comparison
+            await self._resolve_lookup_ids(data)
 
             # Check if data has changed from latest snapshot
             if not await self.has_changes(property_id, data):
-                print(f"[SKIP] No changes for {property_id}")
+                log.info(f"[SKIP] No changes for {property_id}")
+                # The skip stands even if the last-seen update fails
+                try:
+                    await self.mark_seen([property_id])
+                except Exception as e:
+                    log.info(f"[ERROR] Error marking {property_id} as seen: {e}")
                 return (True, 'skipped')
 
-            # Parse address components
-            address_parts = data.get("address_parts", {})
-
-            # Get coordinates
-            coordinates = data.get("coordinates", {})
-
-            # NEW: Create hierarchical address structure
-            # Extract geographic data (from reverse geocoding)
-            county = address_parts.get("county")
-            locality = address_parts.get("locality")
-            postcode_value = address_parts.get("postcode")
-            address_line1 = address_parts.get("line1")
-            full_address = data.get("full_address")
-
-            # Get or create county
-            county_id = await self.get_or_create_county(county)
-
-            # Create hierarchical places (county -> town -> locality -> postcode)
-            # This creates all levels and returns the most specific (postcode if provided)
-            most_specific_place_id = await self.get_or_create_hierarchical_place(
-                county=county,
-                town=town_name,
-                locality=locality,
-                postcode=postcode_value
-            )
-
-            # For address, we want to reference the locality (not postcode)
-            # Create hierarchy without postcode to get locality_id
-            locality_place_id = await self.get_or_create_hierarchical_place(
-                county=county,
-                town=town_name,
-                locality=locality,
-                postcode=None
-            )
-
-            # Create postcode in postcodes table (for backward compatibility)
-            postcode_id = await self.get_or_create_postcode(postcode_value) if postcode_value else None
-
-            # Create address (references locality, not postcode)
-            address_id = await self.get_or_create_address(
-                building=address_line1,
-                street=None,
-                place_id=locality_place_id,
-                postcode_id=postcode_id,
-                display_address=full_address
-            )
+            record = await self._build_property_record(data, town_id, town_name)
 
             # Insert new snapshot
             async with self.pool.acquire() as conn:
-                await conn.execute("""
-                    INSERT INTO properties (
-                        id, property_id, town_id, offer_type_id, property_type_id, status_id, county_id,
-                        address_id, postcode_id, url, price,
-                        address_line1, locality, full_address,
-                        latitude, longitude,
-                        bedrooms, bathrooms, description,
-                        added_on, reduced_on, size, tenure_id, council_tax_band
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22, $23, $24)
-                """,
-                    str(uuid.uuid4()),
-                    property_id,
-                    town_id,
-                    offer_type_id,
-                    property_type_id,
-                    status_id,
-                    county_id,
-                    address_id,
-                    postcode_id,
-                    data.get("url"),
-                    data.get("price"),
-                    address_parts.get("line1"),
-                    locality,
-                    data.get("full_address"),
-                    coordinates.get("latitude"),
-                    coordinates.get("longitude"),
-                    data.get("bedrooms"),
-                    data.get("bathrooms"),
-                    data.get("description"),
-                    data.get("added_on"),
-                    data.get("reduced_on"),
-                    data.get("size"),
-                    tenure_type_id,
-                    data.get("council_tax_band")
-                )
+                await conn.execute(f"""
+                    INSERT INTO properties ({', '.join(PROPERTY_COLUMNS)})
+                    VALUES ({', '.join(f'${n}' for n in range(1, len(PROPERTY_COLUMNS) + 1))})
+                """, *record)
                 return (True, 'inserted')
         except Exception as e:
-            print(f"[ERROR] Error inserting property {data.get('property_id')}: {e}")
+            log.info(f"[ERROR] Error inserting property {data.get('property_id')}: {e}")
             return (False, 'error')
 
+    async def insert_properties_bulk(self, items: list, town_name: str) -> list:
+        """
+        Insert new snapshots for a batch of properties from the same town
+
+        Same rules as insert_property, but the whole batch is checked for
+        identical snapshots with one EXISTS query and the new rows are written
+        with a single COPY inside one transaction.
+
+        Args:
+            items: List of property data dictionaries
+            town_name: Name of the town for these properties
+
+        Returns:
+            List of (success: bool, status: str) tuples, one per item in order
+        """
+        results = [(False, 'error')] * len(items)
+        if not items:
+            return results
+
+        try:
+            town_id = await self.get_or_create_town(town_name)
+        except Exception as e:
+            log.info(f"[ERROR] Error resolving town {town_name}: {e}")
+            return results
+
+        resolved = []
+        for n, data in enumerate(items):
+            try:
+                await self._resolve_lookup_ids(data)
+                resolved.append(n)
+            except Exception as e:
+                log.info(f"[ERROR] Error inserting property {data.get('property_id')}: {e}")
+        if not resolved:
+            return results
+
+        # Same probe as has_changes(), for every item at once: which items
+        # already have an identical snapshot (index-only via idx_properties_dedup)
+        tracked = [
+            (items[n].get("property_id"), items[n].get("price"), items[n].get("status_id"),
+             items[n].get("offer_type_id"), items[n].get("reduced_on"))
+            for n in resolved
+        ]
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT w.n
+                    FROM unnest($1::int[], $2::varchar[], $3::bigint[], $4::int[], $5::int[], $6::varchar[])
+                        AS w(n, property_id, price, status_id, offer_type_id, reduced_on)
+                    WHERE EXISTS(
+                        SELECT 1
+                        FROM properties p
+                        WHERE p.property_id = w.property_id
+                          AND p.price IS NOT DISTINCT FROM w.price
+                          AND p.status_id IS NOT DISTINCT FROM w.status_id
+                          AND p.offer_type_id IS NOT DISTINCT FROM w.offer_type_id
+                          AND p.reduced_on IS NOT DISTINCT FROM w.reduced_on
+                    )
+                """, resolved, *(list(column) for column in zip(*tracked)))
+        except Exception as e:
+            log.info(f"[ERROR] Error checking existing snapshots: {e}")
+            return results
+        duplicates = {row['n'] for row in rows}
+
+        records = []
+        record_positions = []
+        # Tracked fields of rows queued in this batch, so a repeat of the
+        # same property later in the batch is compared against them too
+        batch_keys = set()
+        for n, key in zip(resolved, tracked):
+            data = items[n]
+            property_id = data.get("property_id")
+
+            if n in duplicates or key in batch_keys:
+                log.info(f"[SKIP] No changes for {property_id}")
+                results[n] = (True, 'skipped')
+                continue
+            self._log_change(property_id, data)
+
+            try:
+                records.append(await self._build_property_record(data, town_id, town_name))
+                record_positions.append(n)
+            except Exception as e:
+                log.info(f"[ERROR] Error inserting property {property_id}: {e}")
+                continue
+
+            batch_keys.add(key)
+
+        # Unchanged listings won't be re-fetched by the next few runs
+        try:
+            await self.mark_seen([items[n].get("property_id") for n in duplicates])
+        except Exception as e:
+            log.info(f"[ERROR] Error marking unchanged properties as seen: {e}")
+
+        if records:
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.transaction():
+                        await conn.copy_records_to_table(
+                            'properties',
+                            records=records,
+                            columns=PROPERTY_COLUMNS
+                        )
+            except Exception as e:
+                # One bad row fails the whole COPY; insert row by row so
+                # only that row is lost
+                log.info(f"[WARN] Batch insert of {len(records)} properties failed ({e}), inserting one by one")
+                async with self.pool.acquire() as conn:
+                    for n, record in zip(record_positions, records):
+                        try:
+                            await conn.execute(f"""
+                                INSERT INTO properties ({', '.join(PROPERTY_COLUMNS)})
+                                VALUES ({', '.join(f'${i}' for i in range(1, len(PROPERTY_COLUMNS) + 1))})
+                            """, *record)
+                            results[n] = (True, 'inserted')
+                        except Exception as e:
+                            log.info(f"[ERROR] Error inserting property {items[n].get('property_id')}: {e}")
+                return results
+
+            for n in record_positions:
+                results[n] = (True, 'inserted')
+
+        return results
+
     async def get_property_latest(self, property_id: str) -> Optional[Dict]:
         """Get the latest snapshot for a property by ID"""
         async with self.pool.acquire() as conn:
@@ -807,6 +988,39 @@ class DatabaseConnector:
             )
             return result or 0
 
+    async def get_recently_seen(self, property_ids: list, hours: float) -> set:
+        """
+        Get the IDs among property_ids the scraper saw in the last `hours` hours
+
+        A property counts as seen when a snapshot was inserted (created_at) or
+        it was found unchanged (last_seen_at, see mark_seen).
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT DISTINCT property_id
+                FROM properties
+                WHERE property_id = ANY($1::varchar[])
+                AND COALESCE(last_seen_at, created_at) > NOW() - $2::float8 * INTERVAL '1 hour'
+            """, property_ids, float(hours))
+            return {row['property_id'] for row in rows}
+
+    async def mark_seen(self, property_ids: list):
+        """Record that these properties were just scraped and found unchanged"""
+        if not property_ids:
+            return
+        async with self.pool.acquire() as conn:
+            # Only the latest snapshot of each property is touched
+            await conn.execute("""
+                UPDATE properties
+                SET last_seen_at = NOW()
+                WHERE id IN (
+                    SELECT DISTINCT ON (property_id) id
+                    FROM properties
+                    WHERE property_id = ANY($1::varchar[])
+                    ORDER BY property_id, created_at DESC
+                )
+            """, list(set(property_ids)))
+
     async def get_stats(self) -> Dict:
         """Get database statistics"""
         async with self.pool.acquire() as conn:
@@ -0,0 +1,107 @@
+"""
+Shared helpers for the standalone migration scripts
+"""
+import asyncio
+
+# Indexes backing the place/address lookups the migrations filter on
+# (UPDATE ... WHERE place_id = $1, COUNT(*) ... WHERE parent_id = $1, etc.)
+PLACE_INDEXES = {
+    "idx_addresses_place_id": "addresses(place_id)",
+    "idx_addresses_postcode_id": "addresses(postcode_id)",
+    "idx_places_parent_id": "places(parent_id)",
+    "idx_places_name_type": "places(name, place_type)",
+}
+
+
+async def ensure_place_indexes(conn):
+    """Create the place/address supporting indexes if they don't exist"""
+    for index_name, target in PLACE_INDEXES.items():
+        await conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {target}")
+    print(f"  OK Supporting indexes ready ({', '.join(PLACE_INDEXES)})")
+
+
+async def ensure_parent_cascade(conn):
+    """
+    Make places.parent_id cascade on delete (as init_schema declares it)
+
+    Older databases may have the FK without ON DELETE CASCADE. It is
+    re-added as NOT VALID and validated separately, so the swap itself only
+    holds a brief lock. Relies on idx_places_parent_id for cascade lookups.
+    """
+    is_cascade = await conn.fetchval("""
+        SELECT confdeltype = 'c'
+        FROM pg_constraint
+        WHERE conrelid = 'places'::regclass
+        AND conname = 'places_parent_id_fkey'
+    """)
+
+    if is_cascade:
+        print("  OK places.parent_id already cascades on delete")
+        return
+
+    await conn.execute("""
+        ALTER TABLE places
+        DROP CONSTRAINT IF EXISTS places_parent_id_fkey,
+        ADD CONSTRAINT places_parent_id_fkey
+            FOREIGN KEY (parent_id) REFERENCES places(id)
+            ON DELETE CASCADE NOT VALID
+    """)
+    await conn.execute("ALTER TABLE places VALIDATE CONSTRAINT places_parent_id_fkey")
+    print("  OK places.parent_id now cascades on delete")
+
+
+# Foreign-key indexes on properties used by the property-count checks.
+# Same definitions as init_schema; keep them permanently so cascades and
+# per-place lookups stay index-driven.
+PROPERTY_FK_INDEXES = {
+    "idx_properties_town_id": "properties(town_id)",
+    "idx_properties_postcode_id": "properties(postcode_id)",
+}
+
+
+async def ensure_property_fk_indexes(conn):
+    """
+    Create the properties FK indexes if they don't exist
+
+    Uses CREATE INDEX CONCURRENTLY so writers aren't blocked, which means
+    this must be called outside of a transaction block.
+    """
+    for index_name, target in PROPERTY_FK_INDEXES.items():
+        await conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {target}")
+    print(f"  OK Supporting indexes ready ({', '.join(PROPERTY_FK_INDEXES)})")
+
+
+async def fetch_mapping_state(pool, place_mapping):
+    """
+    Fetch the current state of each orphaned -> correct place pair
+
+    The pairs are independent, so each one is looked up concurrently on its
+    own pooled connection.
+
+    Returns:
+        List of dicts (in mapping order) with the orphaned/correct place rows
+        (name, place_type, parent_id) and their address counts
+    """
+    async def fetch_pair(orphaned_id, correct_id):
+        async with pool.acquire() as conn:
+            return {
+                'orphaned_id': orphaned_id,
+                'correct_id': correct_id,
+                'orphaned': await conn.fetchrow(
+                    "SELECT name, place_type, parent_id FROM places WHERE id = $1", orphaned_id
+                ),
+                'correct': await conn.fetchrow(
+                    "SELECT name, place_type, parent_id FROM places WHERE id = $1", correct_id
+                ),
+                'orphaned_addrs': await conn.fetchval(
+                    "SELECT COUNT(*) FROM addresses WHERE place_id = $1", orphaned_id
+                ),
+                'correct_addrs': await conn.fetchval(
+                    "SELECT COUNT(*) FROM addresses WHERE place_id = $1", correct_id
+                ),
+            }
+
+    return await asyncio.gather(*[
+        fetch_pair(orphaned_id, correct_id)
+        for orphaned_id, correct_id in place_mapping.items()
+    ])
@@ -9,6 +9,7 @@ Handles:
 import asyncio
 import asyncpg
 from db.config import DB_CONFIG
+from db.migration_helpers import ensure_place_indexes, fetch_mapping_state
 
 
 # Mapping: orphaned_id -> correct_id
@@ -20,22 +21,24 @@ PLACE_MAPPING = {
 
 
 async def migrate():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    # Pool so the read-only analysis can fan out; DML runs on one connection
+    pool = await asyncpg.create_pool(**DB_CONFIG, min_size=4, max_size=8)
+    conn = await pool.acquire()
 
     print("=" * 80)
     print("CONSOLIDATE DUPLICATE PLACES & ADDRESSES MIGRATION")
     print("=" * 80)
 
     try:
+        # Step 0: Make sure the lookups below are index-driven
+        print("\nStep 0: Ensuring supporting indexes...")
+        await ensure_place_indexes(conn)
+
         # Step 1: Show current state
         print("\nStep 1: Current state...")
 
-        for orphaned_id, correct_id in PLACE_MAPPING.items():
-            orphaned = await conn.fetchrow("SELECT name FROM places WHERE id = $1", orphaned_id)
-            orphaned_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", orphaned_id)
-            correct_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", correct_id)
-
-            print(f"  {orphaned['name']}: orphaned={orphaned_addrs} addrs, correct={correct_addrs} addrs")
+        for state in await fetch_mapping_state(pool, PLACE_MAPPING):
+            print(f"  {state['orphaned']['name']}: orphaned={state['orphaned_addrs']} addrs, correct={state['correct_addrs']} addrs")
 
         # Step 2: Handle duplicate addresses
         print("\nStep 2: Removing duplicate addresses...")
@@ -87,32 +90,38 @@ async def migrate():
         # Step 4: Handle postcodes linked to orphaned towns
         print("\nStep 4: Consolidating postcodes...")
 
-        orphaned_postcode_ids = []
+        # Fetch the postcodes under every orphaned town in one query, each
+        # paired with its same-named twin (if any) under the correct town
+        orphaned_town_ids = [80, 99, 76]
+        children = await conn.fetch("""
+            SELECT pc.id, pc.name, pc.parent_id, dup.id AS duplicate_id
+            FROM places pc
+            JOIN unnest($1::int[], $2::int[]) AS m(orphaned_id, correct_id)
+                ON pc.parent_id = m.orphaned_id
+            LEFT JOIN places dup
+                ON dup.name = pc.name
+                AND dup.place_type = 'postcode'
+                AND dup.parent_id = m.correct_id
+            WHERE pc.place_type = 'postcode'
+        """, orphaned_town_ids, [PLACE_MAPPING[town_id] for town_id in orphaned_town_ids])
+
+        postcodes_by_town = {}
+        for pc in children:
+            postcodes_by_town.setdefault(pc['parent_id'], []).append(pc)
 
-        for orphaned_town_id in [80, 99, 76]:
-            postcodes = await conn.fetch("""
-                SELECT id, name
-                FROM places
-                WHERE place_type = 'postcode'
-                AND parent_id = $1
-            """, orphaned_town_id)
+        orphaned_postcode_ids = []
 
+        for orphaned_town_id in orphaned_town_ids:
+            postcodes = postcodes_by_town.get(orphaned_town_id)
             if not postcodes:
                 continue
 
             correct_town_id = PLACE_MAPPING[orphaned_town_id]
 
             for pc in postcodes:
-                # Check if this postcode exists under the correct town
-                duplicate = await conn.fetchrow("""
-                    SELECT id
-                    FROM places
-                    WHERE name = $1
-                    AND place_type = 'postcode'
-                    AND parent_id = $2
-                """, pc['name'], correct_town_id)
-
-                if duplicate:
+                duplicate_id = pc['duplicate_id']
+
+                if duplicate_id:
                     # Move addresses from orphaned postcode to correct one
                     # First, delete duplicates
                     dup_addrs = await conn.fetch("""
@@ -125,7 +134,7 @@ async def migrate():
                             WHERE a_correct.postcode_id = $2
                             AND (a_orphan.building, a_orphan.place_id) = (a_correct.building, a_correct.place_id)
                         )
-                    """, pc['id'], duplicate['id'])
+                    """, pc['id'], duplicate_id)
 
                     for da in dup_addrs:
                         await conn.execute("DELETE FROM addresses WHERE id = $1", da['id'])
@@ -135,7 +144,7 @@ async def migrate():
                         UPDATE addresses
                         SET postcode_id = $1
                         WHERE postcode_id = $2
-                    """, duplicate['id'], pc['id'])
+                    """, duplicate_id, pc['id'])
 
                     count = int(result.split()[-1]) if result.split()[-1].isdigit() else 0
                     if count > 0:
@@ -207,7 +216,8 @@ async def migrate():
         traceback.print_exc()
         raise
     finally:
-        await conn.close()
+        await pool.release(conn)
+        await pool.close()
 
 
 if __name__ == "__main__":
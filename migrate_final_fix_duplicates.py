@@ -10,6 +10,7 @@ Steps:
 import asyncio
 import asyncpg
 from db.config import DB_CONFIG
+from db.migration_helpers import ensure_place_indexes, fetch_mapping_state
 
 
 # Mapping: orphaned place_id -> correct place_id
@@ -21,24 +22,26 @@ PLACE_MAPPING = {
 
 
 async def migrate():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    # Pool so the read-only analysis can fan out; DML runs on one connection
+    pool = await asyncpg.create_pool(**DB_CONFIG, min_size=4, max_size=8)
+    conn = await pool.acquire()
 
     print("=" * 80)
     print("COMPREHENSIVE FIX FOR DUPLICATE PLACES")
     print("=" * 80)
 
     try:
+        # Step 0: Make sure the lookups below are index-driven
+        print("\nStep 0: Ensuring supporting indexes...")
+        await ensure_place_indexes(conn)
+
         # Step 1: Analyze current state
         print("\nStep 1: Current state...")
 
-        for orphaned_id, correct_id in PLACE_MAPPING.items():
-            orphaned = await conn.fetchrow("SELECT name FROM places WHERE id = $1", orphaned_id)
-            orphaned_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", orphaned_id)
-            correct_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", correct_id)
-
-            print(f"  {orphaned['name']}:")
-            print(f"    Orphaned ID {orphaned_id}: {orphaned_addrs} addresses")
-            print(f"    Correct  ID {correct_id}: {correct_addrs} addresses")
+        for state in await fetch_mapping_state(pool, PLACE_MAPPING):
+            print(f"  {state['orphaned']['name']}:")
+            print(f"    Orphaned ID {state['orphaned_id']}: {state['orphaned_addrs']} addresses")
+            print(f"    Correct  ID {state['correct_id']}: {state['correct_addrs']} addresses")
 
         # Step 2: Handle duplicate addresses
         print("\nStep 2: Processing duplicate addresses...")
@@ -156,12 +159,17 @@ async def migrate():
         # Step 5: Delete orphaned towns
         print("\nStep 5: Deleting orphaned towns...")
 
+        # Per-place lookups used below: parse/plan once, execute many times
+        place_name_stmt = await conn.prepare("SELECT name FROM places WHERE id = $1")
+        addr_count_stmt = await conn.prepare("SELECT COUNT(*) FROM addresses WHERE place_id = $1")
+        child_count_stmt = await conn.prepare("SELECT COUNT(*) FROM places WHERE parent_id = $1")
+
         for orphaned_id in PLACE_MAPPING.keys():
-            place_name = await conn.fetchval("SELECT name FROM places WHERE id = $1", orphaned_id)
+            place_name = await place_name_stmt.fetchval(orphaned_id)
 
             # Verify no references
-            addr_count = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", orphaned_id)
-            child_count = await conn.fetchval("SELECT COUNT(*) FROM places WHERE parent_id = $1", orphaned_id)
+            addr_count = await addr_count_stmt.fetchval(orphaned_id)
+            child_count = await child_count_stmt.fetchval(orphaned_id)
 
             if addr_count == 0 and child_count == 0:
                 await conn.execute("DELETE FROM places WHERE id = $1", orphaned_id)
@@ -185,7 +193,7 @@ async def migrate():
                 entries = await conn.fetch("SELECT id, parent_id FROM places WHERE name = $1 AND place_type = $2", dup['name'], dup['place_type'])
                 print(f"    - {dup['name']} ({dup['place_type']}): {dup['count']} entries")
                 for e in entries:
-                    addr_count = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", e['id'])
+                    addr_count = await addr_count_stmt.fetchval(e['id'])
                     print(f"      [ID {e['id']}] parent={e['parent_id']}, {addr_count} addresses")
         else:
             print("  OK No place duplicates!")
@@ -207,7 +215,8 @@ async def migrate():
         traceback.print_exc()
         raise
     finally:
-        await conn.close()
+        await pool.release(conn)
+        await pool.close()
 
 
 if __name__ == "__main__":
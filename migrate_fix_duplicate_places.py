@@ -10,6 +10,7 @@ Strategy:
 import asyncio
 import asyncpg
 from db.config import DB_CONFIG
+from db.migration_helpers import ensure_place_indexes, fetch_mapping_state
 
 
 # Mapping: orphaned_id -> correct_id
@@ -22,26 +23,29 @@ PLACE_MAPPING = {
 
 
 async def migrate():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    # Pool so the read-only analysis can fan out; DML runs on one connection
+    pool = await asyncpg.create_pool(**DB_CONFIG, min_size=4, max_size=8)
+    conn = await pool.acquire()
 
     print("=" * 80)
     print("FIX DUPLICATE PLACES MIGRATION")
     print("=" * 80)
 
     try:
+        # Step 0: Make sure the lookups below are index-driven
+        print("\nStep 0: Ensuring supporting indexes...")
+        await ensure_place_indexes(conn)
+
         # Step 1: Show current state
         print("\nStep 1: Current duplicate state...")
 
-        for orphaned_id, correct_id in PLACE_MAPPING.items():
-            orphaned = await conn.fetchrow("SELECT name, place_type, parent_id FROM places WHERE id = $1", orphaned_id)
-            correct = await conn.fetchrow("SELECT name, place_type, parent_id FROM places WHERE id = $1", correct_id)
-
-            orphaned_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", orphaned_id)
-            correct_addrs = await conn.fetchval("SELECT COUNT(*) FROM addresses WHERE place_id = $1", correct_id)
+        for state in await fetch_mapping_state(pool, PLACE_MAPPING):
+            orphaned = state['orphaned']
+            correct = state['correct']
 
             print(f"\n  {orphaned['name']} ({orphaned['place_type']}):")
-            print(f"    Orphaned [ID {orphaned_id}]: parent={orphaned['parent_id']}, {orphaned_addrs} addresses")
-            print(f"    Correct  [ID {correct_id}]: parent={correct['parent_id']}, {correct_addrs} addresses")
+            print(f"    Orphaned [ID {state['orphaned_id']}]: parent={orphaned['parent_id']}, {state['orphaned_addrs']} addresses")
+            print(f"    Correct  [ID {state['correct_id']}]: parent={correct['parent_id']}, {state['correct_addrs']} addresses")
 
         # Step 2: Update addresses to reference correct places
         print("\nStep 2: Updating addresses to reference correct places...")
@@ -61,38 +65,45 @@ async def migrate():
         # Step 3: Handle postcodes linked to orphaned towns
         print("\nStep 3: Handling postcodes linked to orphaned towns...")
 
-        # Find postcodes that are children of orphaned towns
+        # Fetch the postcodes under every orphaned town in one query, each
+        # paired with its same-named twin (if any) under the correct town
+        orphaned_town_ids = [80, 99, 76]
+        children = await conn.fetch("""
+            SELECT pc.id, pc.name, pc.parent_id, dup.id AS duplicate_id
+            FROM places pc
+            JOIN unnest($1::int[], $2::int[]) AS m(orphaned_id, correct_id)
+                ON pc.parent_id = m.orphaned_id
+            LEFT JOIN places dup
+                ON dup.name = pc.name
+                AND dup.place_type = 'postcode'
+                AND dup.parent_id = m.correct_id
+            WHERE pc.place_type = 'postcode'
+        """, orphaned_town_ids, [PLACE_MAPPING[town_id] for town_id in orphaned_town_ids])
+
+        postcodes_by_town = {}
+        for pc in children:
+            postcodes_by_town.setdefault(pc['parent_id'], []).append(pc)
+
+        town_names = dict(await conn.fetch(
+            "SELECT id, name FROM places WHERE id = ANY($1::int[])",
+            list(PLACE_MAPPING.values())
+        ))
+
         orphaned_postcode_ids = []
-        for orphaned_town_id in [80, 99, 76]:
-            postcodes = await conn.fetch("""
-                SELECT id, name, parent_id
-                FROM places
-                WHERE place_type = 'postcode'
-                AND parent_id = $1
-            """, orphaned_town_id)
-
-            for pc in postcodes:
-                # Find if there's a duplicate postcode under the correct town
+        for orphaned_town_id in orphaned_town_ids:
+            for pc in postcodes_by_town.get(orphaned_town_id, []):
                 correct_town_id = PLACE_MAPPING[orphaned_town_id]
 
-                duplicate = await conn.fetchrow("""
-                    SELECT id
-                    FROM places
-                    WHERE name = $1
-                    AND place_type = 'postcode'
-                    AND parent_id = $2
-                """, pc['name'], correct_town_id)
-
-                if duplicate:
+                if pc['duplicate_id']:
                     # Update addresses from orphaned postcode to correct one
                     addr_count = await conn.execute("""
                         UPDATE addresses
                         SET postcode_id = $1
                         WHERE postcode_id = $2
-                    """, duplicate['id'], pc['id'])
+                    """, pc['duplicate_id'], pc['id'])
 
                     count = int(addr_count.split()[-1]) if addr_count.split()[-1].isdigit() else 0
-                    print(f"  Updated {count} addresses: postcode {pc['name']} [{pc['id']}] -> [{duplicate['id']}]")
+                    print(f"  Updated {count} addresses: postcode {pc['name']} [{pc['id']}] -> [{pc['duplicate_id']}]")
 
                     orphaned_postcode_ids.append(pc['id'])
                 else:
@@ -103,7 +114,7 @@ async def migrate():
                         WHERE id = $2
                     """, correct_town_id, pc['id'])
 
-                    town_name = await conn.fetchval("SELECT name FROM places WHERE id = $1", correct_town_id)
+                    town_name = town_names.get(correct_town_id)
                     print(f"  Updated postcode {pc['name']} parent: [{orphaned_town_id}] -> [{correct_town_id}] ({town_name})")
 
         # Step 4: Delete orphaned postcodes
@@ -197,7 +208,8 @@ async def migrate():
         traceback.print_exc()
         raise
     finally:
-        await conn.close()
+        await pool.release(conn)
+        await pool.close()
 
 
 if __name__ == "__main__":
@@ -9,8 +9,10 @@ Example:
   RIGHT: SG1 1SE -> parent_id=27 (Stevenage town)
 """
 import asyncio
+import re
 import asyncpg
 from db.config import DB_CONFIG
+from db.migration_helpers import ensure_place_indexes
 
 
 # Postcode prefix -> Town name mapping
@@ -22,6 +24,17 @@ POSTCODE_TOWN_MAP = {
     'GU22': 'Woking',      # GU22 specifically -> Woking
 }
 
+# Longest prefixes first so GU21/GU22 win over GU
+POSTCODE_PREFIX_RE = re.compile(
+    "^(" + "|".join(sorted(POSTCODE_TOWN_MAP, key=len, reverse=True)) + ")"
+)
+
+
+def expected_town_for(postcode):
+    """Return the town a postcode should belong to, based on its prefix"""
+    match = POSTCODE_PREFIX_RE.match(postcode)
+    return POSTCODE_TOWN_MAP[match.group(1)] if match else None
+
 
 async def migrate():
     conn = await asyncpg.connect(**DB_CONFIG)
@@ -31,6 +44,10 @@ async def migrate():
     print("=" * 80)
 
     try:
+        # Step 0: Make sure the lookups below are index-driven
+        print("\nStep 0: Ensuring supporting indexes...")
+        await ensure_place_indexes(conn)
+
         # Step 1: Find all postcodes with wrong parents
         print("\nStep 1: Finding postcodes with incorrect parents...")
 
@@ -44,32 +61,27 @@ async def migrate():
 
         print(f"  Total postcodes: {len(all_postcodes)}")
 
+        # Per-postcode lookups: parse/plan once, execute many times
+        town_id_stmt = await conn.prepare("""
+            SELECT id FROM places
+            WHERE name = $1 AND place_type = 'town'
+        """)
+        place_stmt = await conn.prepare("SELECT name, place_type FROM places WHERE id = $1")
+        parent_id_stmt = await conn.prepare("SELECT parent_id FROM places WHERE id = $1")
+
         # Check each one
         wrong_parents = []
 
         for pc in all_postcodes:
             # Determine expected town based on postcode prefix
             postcode = pc['name']
-            expected_town = None
-
-            # Check specific prefixes first (GU21, GU22 -> Woking)
-            if postcode.startswith('GU21') or postcode.startswith('GU22'):
-                expected_town = 'Woking'
-            else:
-                # Check general prefix (GU -> Guildford, SG -> Stevenage, etc.)
-                for prefix, town in POSTCODE_TOWN_MAP.items():
-                    if postcode.startswith(prefix) and len(prefix) <= 3:  # Ignore specific ones like GU21
-                        expected_town = town
-                        break
+            expected_town = expected_town_for(postcode)
 
             if not expected_town:
                 continue
 
             # Get expected town ID
-            town_record = await conn.fetchrow("""
-                SELECT id FROM places
-                WHERE name = $1 AND place_type = 'town'
-            """, expected_town)
+            town_record = await town_id_stmt.fetchrow(expected_town)
 
             if not town_record:
                 print(f"  ! Warning: Town '{expected_town}' not found for postcode {postcode}")
@@ -79,7 +91,7 @@ async def migrate():
             if pc['parent_id'] != town_record['id']:
                 parent_name = "NULL"
                 if pc['parent_id']:
-                    parent = await conn.fetchrow("SELECT name, place_type FROM places WHERE id = $1", pc['parent_id'])
+                    parent = await place_stmt.fetchrow(pc['parent_id'])
                     if parent:
                         parent_name = f"{parent['name']} ({parent['place_type']})"
 
@@ -123,10 +135,7 @@ async def migrate():
 
         # Check each town
         for town_name in set(POSTCODE_TOWN_MAP.values()):
-            town = await conn.fetchrow("""
-                SELECT id FROM places
-                WHERE name = $1 AND place_type = 'town'
-            """, town_name)
+            town = await town_id_stmt.fetchrow(town_name)
 
             if not town:
                 continue
@@ -144,26 +153,14 @@ async def migrate():
         # Check for remaining wrong parents
         remaining = 0
         for pc in all_postcodes:
-            postcode = pc['name']
-            expected_town = None
-
-            if postcode.startswith('GU21') or postcode.startswith('GU22'):
-                expected_town = 'Woking'
-            else:
-                for prefix, town in POSTCODE_TOWN_MAP.items():
-                    if postcode.startswith(prefix) and len(prefix) <= 3:
-                        expected_town = town
-                        break
+            expected_town = expected_town_for(pc['name'])
 
             if expected_town:
-                town_record = await conn.fetchrow("""
-                    SELECT id FROM places
-                    WHERE name = $1 AND place_type = 'town'
-                """, expected_town)
+                town_record = await town_id_stmt.fetchrow(expected_town)
 
                 if town_record:
                     # Re-fetch current parent_id
-                    current = await conn.fetchval("SELECT parent_id FROM places WHERE id = $1", pc['id'])
+                    current = await parent_id_stmt.fetchval(pc['id'])
                     if current != town_record['id']:
                         remaining += 1
 
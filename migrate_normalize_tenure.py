@@ -9,12 +9,21 @@ This migration:
 5. Removes old tenure column
 
 Safe to run multiple times (idempotent)
+
+Set MIGRATE_DROP_OLD_COLUMN=1 to drop the old tenure column without
+prompting (e.g. in automated pipelines).
 """
 import asyncio
+import os
+import sys
 import asyncpg
 from db.config import DB_CONFIG
 
 
+# Rows linked per transaction in Step 5
+TENURE_UPDATE_BATCH_SIZE = 30000
+
+
 async def migrate():
     """Normalize tenure field"""
     conn = await asyncpg.connect(**DB_CONFIG)
@@ -53,30 +62,23 @@ async def migrate():
         print("\nStep 3: Populating tenure_types table...")
 
         if tenure_col_exists:
-            # Get distinct non-null tenure values
-            distinct_tenures = await conn.fetch("""
+            # Extract distinct non-null tenure values and insert them server-side
+            # in one statement (ON CONFLICT DO NOTHING makes it idempotent)
+            inserted = await conn.fetch("""
+                INSERT INTO tenure_types (name)
                 SELECT DISTINCT tenure
                 FROM properties
                 WHERE tenure IS NOT NULL
-                ORDER BY tenure
+                ON CONFLICT (name) DO NOTHING
+                RETURNING name
             """)
 
-            if distinct_tenures:
-                print(f"  Found {len(distinct_tenures)} distinct tenure values:")
-                for row in distinct_tenures:
-                    print(f"    - {row['tenure']}")
-
-                # Insert into tenure_types (ON CONFLICT DO NOTHING makes it idempotent)
-                for row in distinct_tenures:
-                    await conn.execute("""
-                        INSERT INTO tenure_types (name)
-                        VALUES ($1)
-                        ON CONFLICT (name) DO NOTHING
-                    """, row['tenure'])
-
-                print(f"  OK Inserted {len(distinct_tenures)} tenure types")
+            if inserted:
+                print(f"  OK Inserted {len(inserted)} new tenure types:")
+                for row in sorted(inserted, key=lambda r: r['name']):
+                    print(f"    - {row['name']}")
             else:
-                print("  ! No tenure values found in properties table")
+                print("  ! No new tenure values found in properties table")
                 # Insert common UK tenure types anyway
                 print("  Inserting standard UK tenure types...")
                 await conn.execute("""
@@ -118,17 +120,43 @@ async def migrate():
         if tenure_col_exists:
             print("\nStep 5: Linking existing properties to tenure_types...")
 
-            # Update properties to use tenure_id
-            updated = await conn.execute("""
-                UPDATE properties p
-                SET tenure_id = t.id
-                FROM tenure_types t
-                WHERE p.tenure = t.name
-                AND p.tenure_id IS NULL
+            # Temporary partial index so the UPDATE only visits unlinked rows
+            # instead of seqscanning/hash-joining the whole properties table
+            await conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_properties_tenure_null
+                ON properties(tenure)
+                WHERE tenure_id IS NULL
             """)
 
-            # Extract count from result string like "UPDATE 20"
-            update_count = int(updated.split()[-1]) if updated.split()[-1].isdigit() else 0
+            # Update properties to use tenure_id in bounded batches, committing
+            # between them to cap lock scope and WAL per transaction.
+            # properties.id is a UUID, so batches are picked with LIMIT rather
+            # than by id range; linked rows drop out of the partial index.
+            update_count = 0
+            while True:
+                async with conn.transaction():
+                    updated = await conn.execute("""
+                        UPDATE properties p
+                        SET tenure_id = t.id
+                        FROM tenure_types t
+                        WHERE p.tenure = t.name
+                        AND p.id IN (
+                            SELECT p2.id
+                            FROM properties p2
+                            JOIN tenure_types t2 ON p2.tenure = t2.name
+                            WHERE p2.tenure_id IS NULL
+                            LIMIT $1
+                        )
+                    """, TENURE_UPDATE_BATCH_SIZE)
+
+                # Extract count from result string like "UPDATE 20"
+                batch_count = int(updated.split()[-1]) if updated.split()[-1].isdigit() else 0
+                update_count += batch_count
+                if batch_count < TENURE_UPDATE_BATCH_SIZE:
+                    break
+
+            await conn.execute("DROP INDEX IF EXISTS idx_properties_tenure_null")
+
             print(f"  OK Linked {update_count} properties to tenure_types")
 
             # Check for unmapped properties
@@ -149,14 +177,22 @@ async def migrate():
         if tenure_col_exists:
             print("\nStep 6: Dropping old tenure column...")
 
-            # Ask for confirmation
-            print("\n" + "=" * 80)
-            print("WARNING  IMPORTANT: About to drop the old 'tenure' column")
-            print("All data has been migrated to tenure_id")
-            print("=" * 80)
-            response = input("\nProceed with dropping 'tenure' column? (yes/no): ").strip().lower()
+            if os.getenv("MIGRATE_DROP_OLD_COLUMN") == "1":
+                drop_column = True
+            elif sys.stdin.isatty():
+                # Ask for confirmation without blocking the event loop
+                print("\n" + "=" * 80)
+                print("WARNING  IMPORTANT: About to drop the old 'tenure' column")
+                print("All data has been migrated to tenure_id")
+                print("=" * 80)
+                response = await asyncio.to_thread(
+                    input, "\nProceed with dropping 'tenure' column? (yes/no): "
+                )
+                drop_column = response.strip().lower() in ['yes', 'y']
+            else:
+                drop_column = False
 
-            if response in ['yes', 'y']:
+            if drop_column:
                 await conn.execute("""
                     ALTER TABLE properties
                     DROP COLUMN tenure
@@ -164,7 +200,7 @@ async def migrate():
                 print("  OK Old tenure column dropped")
             else:
                 print("  - Skipped dropping tenure column (keeping for now)")
-                print("    You can manually drop it later with:")
+                print("    Re-run with MIGRATE_DROP_OLD_COLUMN=1, or drop it manually with:")
                 print("    ALTER TABLE properties DROP COLUMN tenure;")
         else:
             print("\nStep 6: Skipped (tenure column already removed)")
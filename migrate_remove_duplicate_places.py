@@ -4,11 +4,16 @@ Migration to remove duplicate orphaned places
 Strategy:
 1. Identify duplicates (same name, same place_type)
 2. Keep the one with proper parent_id (not NULL)
-3. Delete orphaned duplicates (parent_id IS NULL) that have no properties
+3. Delete orphaned duplicates (parent_id IS NULL) that have no properties;
+   their child places are removed by ON DELETE CASCADE
+
+Duplicates are summarised with one aggregate query and the deletion runs
+as a single DELETE statement driven by CTEs.
 """
 import asyncio
 import asyncpg
 from db.config import DB_CONFIG
+from db.migration_helpers import ensure_parent_cascade, ensure_place_indexes, ensure_property_fk_indexes
 
 
 async def migrate():
@@ -19,136 +24,157 @@ async def migrate():
     print("=" * 80)
 
     try:
-        # Step 1: Find duplicate places
-        print("\nStep 1: Finding duplicate places...")
-
-        duplicates = await conn.fetch("""
-            SELECT name, place_type
-            FROM places
-            GROUP BY name, place_type
-            HAVING COUNT(*) > 1
-            ORDER BY name, place_type
-        """)
-
-        print(f"  Found {len(duplicates)} duplicate place name(s)")
-
-        # Step 2: For each duplicate, identify orphaned entries
-        print("\nStep 2: Identifying orphaned duplicates to remove...")
-
-        orphaned_to_delete = []
-
-        for dup in duplicates:
-            entries = await conn.fetch("""
-                SELECT id, name, place_type, parent_id
-                FROM places
-                WHERE name = $1 AND place_type = $2
-                ORDER BY id
-            """, dup['name'], dup['place_type'])
-
-            # Count entries with and without parent_id
-            with_parent = [e for e in entries if e['parent_id'] is not None]
-            without_parent = [e for e in entries if e['parent_id'] is None]
-
-            if with_parent and without_parent:
-                # We have both - check if orphaned ones have no properties
-                for orphan in without_parent:
-                    # Check property references
-                    prop_count = 0
-                    if orphan['place_type'] == 'town':
-                        prop_count = await conn.fetchval(
-                            "SELECT COUNT(*) FROM properties WHERE town_id = $1",
-                            orphan['id']
-                        )
-                    elif orphan['place_type'] == 'postcode':
-                        prop_count = await conn.fetchval(
-                            "SELECT COUNT(*) FROM properties WHERE postcode_id = $1",
-                            orphan['id']
-                        )
-
-                    if prop_count == 0:
-                        orphaned_to_delete.append({
-                            'id': orphan['id'],
-                            'name': orphan['name'],
-                            'place_type': orphan['place_type'],
-                            'parent_id': orphan['parent_id']
-                        })
-                        print(f"  - [{orphan['id']}] {orphan['name']} ({orphan['place_type']}) - 0 properties")
-                    else:
-                        print(f"  ! [{orphan['id']}] {orphan['name']} ({orphan['place_type']}) - {prop_count} properties (SKIP)")
-
-        if not orphaned_to_delete:
-            print("  No orphaned duplicates to delete!")
-            return
-
-        print(f"\n  Total to delete: {len(orphaned_to_delete)}")
-
-        # Step 3: Delete orphaned duplicates
-        print("\nStep 3: Deleting orphaned duplicates...")
-
-        for orphan in orphaned_to_delete:
-            # First, delete any child places (like postcodes under orphaned towns)
-            if orphan['place_type'] == 'town':
-                children = await conn.fetch("""
-                    SELECT id, name, place_type
+        # Step 0: Index the property FK columns (concurrently, so this has to
+        # happen before the transaction below is opened)
+        print("\nStep 0: Ensuring supporting indexes...")
+        await ensure_place_indexes(conn)
+        await ensure_property_fk_indexes(conn)
+        await ensure_parent_cascade(conn)
+
+        # One transaction for the whole cleanup: all-or-nothing, one commit
+        async with conn.transaction():
+            # Idempotent cleanup: a crash right after commit may lose it, but
+            # re-running recovers, so skip waiting on the WAL fsync
+            await conn.execute("SET LOCAL synchronous_commit = off")
+
+            # Step 1: Summarise duplicate groups server-side. Only duplicated
+            # rows are aggregated (EXISTS self-join), and FILTER splits them
+            # into parented/orphaned counts without shipping every row
+            print("\nStep 1: Finding duplicate places...")
+
+            duplicates = await conn.fetch("""
+                SELECT name, place_type,
+                       COUNT(*) FILTER (WHERE parent_id IS NOT NULL) AS with_parent,
+                       COUNT(*) FILTER (WHERE parent_id IS NULL) AS without_parent,
+                       array_agg(id ORDER BY id) FILTER (WHERE parent_id IS NULL) AS orphan_ids
+                FROM places p
+                WHERE EXISTS (
+                    SELECT 1
+                    FROM places p2
+                    WHERE p2.name = p.name
+                    AND p2.place_type = p.place_type
+                    AND p2.id <> p.id
+                )
+                GROUP BY name, place_type
+                ORDER BY name, place_type
+            """)
+
+            print(f"  Found {len(duplicates)} duplicate place name(s)")
+
+            # Orphans are only removable when a parented twin exists
+            candidate_ids = [
+                orphan_id
+                for dup in duplicates
+                if dup['with_parent'] and dup['without_parent']
+                for orphan_id in dup['orphan_ids']
+            ]
+
+            if not candidate_ids:
+                print("  No orphaned duplicates to delete!")
+                return
+
+            print(f"  {len(candidate_ids)} orphaned duplicate(s) to check for properties")
+
+            # Step 2: Delete the candidates without properties server-side in
+            # one statement; the database cascades to their child places
+            print("\nStep 2: Deleting orphaned duplicates...")
+
+            deleted = await conn.fetch("""
+                WITH orphans AS (
+                    SELECT p.id, p.place_type
+                    FROM places p
+                    WHERE p.id = ANY($1::int[])
+                    AND NOT (p.place_type = 'town' AND EXISTS (
+                        SELECT 1 FROM properties WHERE town_id = p.id
+                    ))
+                    AND NOT (p.place_type = 'postcode' AND EXISTS (
+                        SELECT 1 FROM properties WHERE postcode_id = p.id
+                    ))
+                ),
+                -- Children go with their parent via ON DELETE CASCADE;
+                -- listed here (same snapshot) only for reporting
+                children AS (
+                    SELECT c.id, c.name, c.place_type, FALSE AS is_orphan
+                    FROM places c
+                    WHERE c.parent_id IN (SELECT id FROM orphans)
+                ),
+                deleted_orphans AS (
+                    DELETE FROM places
+                    WHERE id IN (SELECT id FROM orphans)
+                    RETURNING id, name, place_type, TRUE AS is_orphan
+                )
+                SELECT * FROM children
+                UNION ALL
+                SELECT * FROM deleted_orphans
+                ORDER BY is_orphan, name, id
+            """, candidate_ids)
+
+            if not deleted:
+                print("  No orphaned duplicates without properties to delete!")
+                return
+
+            # Build the per-row report and write it out in one go
+            orphan_count = 0
+            lines = []
+            for place in deleted:
+                if place['is_orphan']:
+                    orphan_count += 1
+                    lines.append(f"  Deleted: [{place['id']}] {place['name']} ({place['place_type']})")
+                else:
+                    lines.append(f"    Deleted child: [{place['id']}] {place['name']} ({place['place_type']})")
+
+            lines.append(f"  OK Deleted {orphan_count} orphaned place(s) and {len(deleted) - orphan_count} child place(s)")
+            print("\n".join(lines))
+
+            # Step 3: Verify cleanup. Step 1 already counted every duplicate
+            # group, so subtract the RETURNING rows from those counts and only
+            # re-run the GROUP BY scan when something is left over
+            print("\nStep 3: Verifying cleanup...")
+
+            remaining_counts = {
+                (dup['name'], dup['place_type']): dup['with_parent'] + dup['without_parent']
+                for dup in duplicates
+            }
+            for place in deleted:
+                key = (place['name'], place['place_type'])
+                if key in remaining_counts:
+                    remaining_counts[key] -= 1
+
+            remaining_duplicates = []
+            if any(count > 1 for count in remaining_counts.values()):
+                remaining_duplicates = await conn.fetch("""
+                    SELECT name, place_type, COUNT(*) as count
                     FROM places
-                    WHERE parent_id = $1
-                """, orphan['id'])
-
-                for child in children:
-                    # Check if child has properties
-                    child_props = 0
-                    if child['place_type'] == 'postcode':
-                        child_props = await conn.fetchval(
-                            "SELECT COUNT(*) FROM properties WHERE postcode_id = $1",
-                            child['id']
-                        )
-
-                    if child_props == 0:
-                        await conn.execute("DELETE FROM places WHERE id = $1", child['id'])
-                        print(f"    Deleted child: [{child['id']}] {child['name']} ({child['place_type']})")
-                    else:
-                        print(f"    ! Skipped child with {child_props} properties: [{child['id']}] {child['name']}")
-
-            # Delete the orphaned entry
-            await conn.execute("DELETE FROM places WHERE id = $1", orphan['id'])
-            print(f"  Deleted: [{orphan['id']}] {orphan['name']} ({orphan['place_type']})")
-
-        # Step 4: Verify cleanup
-        print("\nStep 4: Verifying cleanup...")
-
-        remaining_duplicates = await conn.fetch("""
-            SELECT name, place_type, COUNT(*) as count
-            FROM places
-            GROUP BY name, place_type
-            HAVING COUNT(*) > 1
-            ORDER BY name, place_type
-        """)
-
-        if remaining_duplicates:
-            print(f"  ! Warning: {len(remaining_duplicates)} duplicate(s) still remain:")
-            for dup in remaining_duplicates:
-                print(f"    - {dup['name']} ({dup['place_type']}): {dup['count']} entries")
-        else:
-            print("  OK No duplicates remaining!")
-
-        # Step 5: Check for orphaned towns
-        print("\nStep 5: Checking for orphaned towns...")
-
-        orphaned_towns = await conn.fetchval("""
-            SELECT COUNT(*)
-            FROM places
-            WHERE place_type = 'town'
-            AND parent_id IS NULL
-        """)
-
-        if orphaned_towns == 0:
-            print("  OK No orphaned towns!")
-        else:
-            print(f"  ! Warning: {orphaned_towns} orphaned town(s) still exist")
-
-        print("\n" + "=" * 80)
-        print("MIGRATION COMPLETED SUCCESSFULLY")
-        print("=" * 80)
+                    GROUP BY name, place_type
+                    HAVING COUNT(*) > 1
+                    ORDER BY name, place_type
+                """)
+
+            if remaining_duplicates:
+                print(f"  ! Warning: {len(remaining_duplicates)} duplicate(s) still remain:")
+                for dup in remaining_duplicates:
+                    print(f"    - {dup['name']} ({dup['place_type']}): {dup['count']} entries")
+            else:
+                print("  OK No duplicates remaining!")
+
+            # Step 4: Check for orphaned towns
+            print("\nStep 4: Checking for orphaned towns...")
+
+            orphaned_towns = await conn.fetchval("""
+                SELECT COUNT(*)
+                FROM places
+                WHERE place_type = 'town'
+                AND parent_id IS NULL
+            """)
+
+            if orphaned_towns == 0:
+                print("  OK No orphaned towns!")
+            else:
+                print(f"  ! Warning: {orphaned_towns} orphaned town(s) still exist")
+
+            print("\n" + "=" * 80)
+            print("MIGRATION COMPLETED SUCCESSFULLY")
+            print("=" * 80)
 
     except Exception as e:
         print(f"\nERROR Migration failed: {e}")
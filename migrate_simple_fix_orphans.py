@@ -25,109 +25,138 @@ async def migrate():
     print("=" * 80)
 
     try:
-        # Step 1: Find orphaned towns
-        print("\nStep 1: Finding orphaned towns...")
-
-        orphaned_towns = await conn.fetch("""
-            SELECT id, name, place_type, parent_id
-            FROM places
-            WHERE place_type = 'town'
-            AND parent_id IS NULL
-            ORDER BY name
-        """)
-
-        if not orphaned_towns:
-            print("  No orphaned towns found!")
-            return
-
-        print(f"  Found {len(orphaned_towns)} orphaned town(s):")
-        for town in orphaned_towns:
-            county = TOWN_COUNTY_MAP.get(town['name'], 'Unknown')
-            print(f"    - {town['name']} (ID: {town['id']}) -> should be in {county}")
-
-        # Step 2: Ensure counties exist
-        print("\nStep 2: Ensuring county entries exist...")
-
-        county_ids = {}
-        for county_name in set(TOWN_COUNTY_MAP.values()):
-            county_id = await conn.fetchval("""
-                SELECT id FROM places
+        # One transaction for the whole fix: all-or-nothing, one commit
+        async with conn.transaction():
+            # Idempotent cleanup: a crash right after commit may lose it, but
+            # re-running recovers, so skip waiting on the WAL fsync
+            await conn.execute("SET LOCAL synchronous_commit = off")
+
+            # Step 1: Find orphaned towns
+            print("\nStep 1: Finding orphaned towns...")
+
+            orphaned_towns = await conn.fetch("""
+                SELECT id, name, place_type, parent_id
+                FROM places
+                WHERE place_type = 'town'
+                AND parent_id IS NULL
+                ORDER BY name
+            """)
+
+            if not orphaned_towns:
+                print("  No orphaned towns found!")
+                return
+
+            lines = [f"  Found {len(orphaned_towns)} orphaned town(s):"]
+            for town in orphaned_towns:
+                county = TOWN_COUNTY_MAP.get(town['name'], 'Unknown')
+                lines.append(f"    - {town['name']} (ID: {town['id']}) -> should be in {county}")
+            print("\n".join(lines))
+
+            # Split orphans into mappable towns and ones with no known county
+            # up front, and only ask for the counties actually needed
+            linkable = [t for t in orphaned_towns if t['name'] in TOWN_COUNTY_MAP]
+            unknown = [t for t in orphaned_towns if t['name'] not in TOWN_COUNTY_MAP]
+            wanted_counties = list({TOWN_COUNTY_MAP[t['name']] for t in linkable})
+
+            # Step 2: Ensure counties exist
+            print("\nStep 2: Ensuring county entries exist...")
+
+            # Create every missing county in one statement, then read back the
+            # ids of all of them (the oldest row, should duplicates exist)
+            created = await conn.fetch("""
+                INSERT INTO places (name, place_type, parent_id)
+                SELECT w.name, 'county', NULL
+                FROM unnest($1::text[]) AS w(name)
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM places p
+                    WHERE p.place_type = 'county' AND p.name = w.name
+                )
+                RETURNING id
+            """, wanted_counties)
+            created_ids = {row['id'] for row in created}
+
+            counties = await conn.fetch("""
+                SELECT DISTINCT ON (name) id, name
+                FROM places
                 WHERE place_type = 'county'
-                AND name = $1
-            """, county_name)
-
-            if county_id:
-                print(f"  OK {county_name} exists (ID: {county_id})")
-                county_ids[county_name] = county_id
+                AND name = ANY($1::text[])
+                ORDER BY name, id
+            """, wanted_counties)
+
+            county_ids = {}
+            lines = []
+            for county in counties:
+                if county['id'] in created_ids:
+                    lines.append(f"  + Created {county['name']} (ID: {county['id']})")
+                else:
+                    lines.append(f"  OK {county['name']} exists (ID: {county['id']})")
+                county_ids[county['name']] = county['id']
+            print("\n".join(lines))
+
+            # Step 3: Link orphaned towns to counties
+            print("\nStep 3: Linking orphaned towns to their counties...")
+
+            updates = [
+                (county_ids[TOWN_COUNTY_MAP[t['name']]], t['id'])
+                for t in linkable
+            ]
+
+            lines = [f"  ! Unknown county for {t['name']}, skipping" for t in unknown]
+            lines.extend(
+                f"  OK Linked {t['name']} (ID {t['id']}) -> {TOWN_COUNTY_MAP[t['name']]} (ID {county_id})"
+                for t, (county_id, _) in zip(linkable, updates)
+            )
+            print("\n".join(lines))
+
+            # Submit all parent_id updates in one protocol exchange
+            if updates:
+                await conn.executemany("""
+                    UPDATE places
+                    SET parent_id = $1
+                    WHERE id = $2
+                """, updates)
+
+            # Step 4: Verify fix
+            print("\nStep 4: Verifying fix...")
+
+            remaining_orphans = await conn.fetchval("""
+                SELECT COUNT(*)
+                FROM places
+                WHERE place_type = 'town'
+                AND parent_id IS NULL
+            """)
+
+            if remaining_orphans == 0:
+                print("  OK No orphaned towns remaining!")
             else:
-                county_id = await conn.fetchval("""
-                    INSERT INTO places (name, place_type, parent_id)
-                    VALUES ($1, 'county', NULL)
-                    RETURNING id
-                """, county_name)
-                print(f"  + Created {county_name} (ID: {county_id})")
-                county_ids[county_name] = county_id
-
-        # Step 3: Link orphaned towns to counties
-        print("\nStep 3: Linking orphaned towns to their counties...")
-
-        for town in orphaned_towns:
-            town_name = town['name']
-            county_name = TOWN_COUNTY_MAP.get(town_name)
-
-            if not county_name:
-                print(f"  ! Unknown county for {town_name}, skipping")
-                continue
-
-            county_id = county_ids[county_name]
-
-            await conn.execute("""
-                UPDATE places
-                SET parent_id = $1
-                WHERE id = $2
-            """, county_id, town['id'])
-
-            print(f"  OK Linked {town_name} (ID {town['id']}) -> {county_name} (ID {county_id})")
-
-        # Step 4: Verify fix
-        print("\nStep 4: Verifying fix...")
-
-        remaining_orphans = await conn.fetchval("""
-            SELECT COUNT(*)
-            FROM places
-            WHERE place_type = 'town'
-            AND parent_id IS NULL
-        """)
-
-        if remaining_orphans == 0:
-            print("  OK No orphaned towns remaining!")
-        else:
-            print(f"  ! Warning: {remaining_orphans} orphaned town(s) still exist")
-
-        # Step 5: Show summary
-        print("\nStep 5: Town hierarchy summary...")
-
-        towns = await conn.fetch("""
-            SELECT
-                t.id,
-                t.name as town_name,
-                c.name as county_name,
-                COUNT(DISTINCT a.id) as address_count
-            FROM places t
-            LEFT JOIN places c ON t.parent_id = c.id
-            LEFT JOIN addresses a ON a.place_id = t.id
-            WHERE t.place_type = 'town'
-            GROUP BY t.id, t.name, c.name
-            ORDER BY t.name
-        """)
-
-        for town in towns:
-            county = town['county_name'] if town['county_name'] else 'NULL'
-            print(f"  {town['town_name']} (ID {town['id']}) -> {county}: {town['address_count']} addresses")
-
-        print("\n" + "=" * 80)
-        print("MIGRATION COMPLETED SUCCESSFULLY")
-        print("=" * 80)
+                print(f"  ! Warning: {remaining_orphans} orphaned town(s) still exist")
+
+            # Step 5: Show summary
+            print("\nStep 5: Town hierarchy summary...")
+
+            towns = await conn.fetch("""
+                SELECT
+                    t.id,
+                    t.name as town_name,
+                    c.name as county_name,
+                    COUNT(DISTINCT a.id) as address_count
+                FROM places t
+                LEFT JOIN places c ON t.parent_id = c.id
+                LEFT JOIN addresses a ON a.place_id = t.id
+                WHERE t.place_type = 'town'
+                GROUP BY t.id, t.name, c.name
+                ORDER BY t.name
+            """)
+
+            lines = []
+            for town in towns:
+                county = town['county_name'] if town['county_name'] else 'NULL'
+                lines.append(f"  {town['town_name']} (ID {town['id']}) -> {county}: {town['address_count']} addresses")
+            print("\n".join(lines))
+
+            print("\n" + "=" * 80)
+            print("MIGRATION COMPLETED SUCCESSFULLY")
+            print("=" * 80)
 
     except Exception as e:
         print(f"\nERROR: {e}")
@@ -2,8 +2,9 @@
 Migration script to change size column from VARCHAR to INTEGER
 
 This will:
-1. Drop the existing size column (if it has VARCHAR data)
-2. Add a new size column as INTEGER
+1. Convert an existing VARCHAR size column to INTEGER in place, keeping
+   the first number of each value (e.g. "1,234 sq ft / 115 sq m" -> 1234)
+2. Add the size column as INTEGER if it doesn't exist yet
 """
 import asyncio
 import asyncpg
@@ -16,30 +17,45 @@ async def migrate():
     print("Starting migration: Changing size column to INTEGER...")
 
     try:
-        # Check if size column exists
-        result = await conn.fetchval("""
-            SELECT COUNT(*)
+        # Check if size column exists (and what type it has)
+        data_type = await conn.fetchval("""
+            SELECT data_type
             FROM information_schema.columns
             WHERE table_name='properties' AND column_name='size'
         """)
 
-        if result > 0:
-            print("\nDropping existing size column...")
-            await conn.execute("""
+        if data_type == 'integer':
+            print("\nsize column is already INTEGER - nothing to do")
+            return
+
+        if data_type:
+            # Single-pass rewrite that keeps existing data, instead of
+            # dropping and re-adding the column. Only the first number counts
+            # (commas dropped); values too long for INTEGER become NULL
+            print(f"\nConverting existing size column ({data_type}) to INTEGER...")
+            await conn.execute(r"""
                 ALTER TABLE properties
-                DROP COLUMN size
+                ALTER COLUMN size TYPE INTEGER
+                USING CASE
+                    WHEN length(replace(substring(size FROM '(\d[\d,]*)'), ',', '')) BETWEEN 1 AND 9
+                    THEN replace(substring(size FROM '(\d[\d,]*)'), ',', '')::INTEGER
+                END
             """)
 
-        print("Adding size column as INTEGER...")
-        await conn.execute("""
-            ALTER TABLE properties
-            ADD COLUMN size INTEGER
-        """)
+            print("\nMigration completed successfully!")
+            print("\nColumn updated:")
+            print(f"  - size: {data_type} -> integer")
+            print("\nNote: Existing size values were converted; unparsable values are now NULL.")
+        else:
+            print("Adding size column as INTEGER...")
+            await conn.execute("""
+                ALTER TABLE properties
+                ADD COLUMN size INTEGER
+            """)
 
-        print("\nMigration completed successfully!")
-        print("\nColumn updated:")
-        print("  - size: VARCHAR(50) -> INTEGER")
-        print("\nNote: Existing size data has been cleared. Re-run scraper to populate.")
+            print("\nMigration completed successfully!")
+            print("\nColumn added:")
+            print("  - size: integer")
 
     except Exception as e:
         print(f"\nMigration failed: {e}")
@@ -27,12 +27,27 @@ def purge_all_tasks():
     redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
     redis_client = Redis.from_url(redis_url)
 
-    # Delete all Celery queue keys
+    # Queue lists, their priority variants (e.g. "scraper\x06\x163") and
+    # the unacked bookkeeping keys. Kombu bindings (_kombu.binding.*) are
+    # left alone so routing keeps working for running workers.
     queues = ['celery', 'scraper', 'geocoding', 'email']
-    for queue in queues:
-        deleted = redis_client.delete(queue)
-        if deleted:
-            print(f"  Cleared queue: {queue}")
+    patterns = [f"{queue}\x06\x16*" for queue in queues] + ['unacked*']
+
+    keys = [queue for queue in queues if redis_client.exists(queue)]
+    for pattern in patterns:
+        keys.extend(redis_client.scan_iter(match=pattern, count=1000))
+
+    # UNLINK reclaims memory in a background thread instead of blocking
+    # Redis on large lists; pipeline one round-trip per 1000 keys
+    for start in range(0, len(keys), 1000):
+        with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys[start:start + 1000]:
+                pipe.unlink(key)
+            pipe.execute()
+
+    for key in keys:
+        name = key.decode(errors='replace') if isinstance(key, bytes) else key
+        print(f"  Cleared: {name!r}")
 
     print("\n✓ All tasks purged successfully")
 
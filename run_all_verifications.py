@@ -0,0 +1,30 @@
+"""
+Run the schema/hierarchy verification scripts together on one connection pool
+
+Usage:
+    python run_all_verifications.py
+"""
+import asyncio
+from db.connect import close_pool
+import verify_new_fields
+import verify_size_column
+import verify_places_fix
+
+
+async def main():
+    # All three scripts share the memoized pool from db/connect.py
+    try:
+        # Each script prints nothing until all of its queries are back and
+        # then prints its whole report without awaiting, so the reports
+        # don't interleave
+        await asyncio.gather(
+            verify_new_fields.verify(),
+            verify_size_column.verify(),
+            verify_places_fix.verify(),
+        )
+    finally:
+        await close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
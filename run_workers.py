@@ -12,12 +12,59 @@ Usage:
 
     # Start with more workers (concurrency)
     python run_workers.py --concurrency 4
+
+    # Production: run email and scraper as separate worker processes so
+    # notifications never wait behind a long scrape
+    python run_workers.py --queue email
+    python run_workers.py --queue scraper
 """
+import os
 import sys
 import argparse
+
+# Must be set before the app is imported so it registers the task modules
+os.environ.setdefault('CELERY_WORKER', '1')
 from workers.celery_app import app
 
 
+# Tasks each worker process reserves ahead of time. Long-running scraper and
+# geocoding tasks use 1 so a slow task doesn't hold others hostage; short
+# email tasks prefetch a batch so the broker isn't polled per message.
+PREFETCH_MULTIPLIERS = {
+    'geocoding': 1,
+    'scraper': 1,
+    'email': 16,
+    'all': 1,
+}
+
+# Pool and concurrency used when not given on the command line. Every queue
+# runs on processes: geocoding and email tasks drive asyncio/asyncpg, which
+# allows one running loop per OS thread, and gevent's greenlets all share
+# one. --pool gevent is available as an opt-in.
+POOL_DEFAULTS = {
+    'geocoding': ('prefork', 2),
+    'scraper': ('prefork', 2),
+    'email': ('prefork', 2),
+    'all': ('prefork', 2),
+}
+
+# Recycle a worker child after this many tasks / this much resident memory
+# (KB). Only the child's own memory counts; Chromium runs in separate
+# processes, which the scraper worker closes when its child exits.
+MAX_TASKS_PER_CHILD = 500
+MAX_MEMORY_PER_CHILD = 512000
+
+# (soft, hard) seconds before a task gets SoftTimeLimitExceeded, then is
+# killed outright. A scrape works through every enabled search in one task
+# and can run for hours, so queues that take scraper tasks have no limit.
+TIME_LIMITS = {
+    'geocoding': (1500, 1800),
+    'scraper': None,
+    'email': (1500, 1800),
+    'all': None,
+}
+
+
 def main():
     parser = argparse.ArgumentParser(description='Run Celery workers')
     parser.add_argument(
@@ -29,8 +76,16 @@ def main():
     parser.add_argument(
         '--concurrency',
         type=int,
-        default=2,
-        help='Number of worker processes (default: 2)'
+        default=None,
+        help='Number of worker processes/greenlets (default: 2)'
+    )
+    parser.add_argument(
+        '--pool',
+        choices=['prefork', 'gevent'],
+        default=None,
+        help='Execution pool (default: prefork). gevent is not installed by '
+             'requirements.txt and is unsupported for the asyncio-backed '
+             'geocoding and email tasks'
     )
     parser.add_argument(
         '--loglevel',
@@ -41,13 +96,35 @@ def main():
 
     args = parser.parse_args()
 
+    default_pool, default_concurrency = POOL_DEFAULTS[args.queue]
+    pool = args.pool or default_pool
+    concurrency = args.concurrency or default_concurrency
+
     # Build worker arguments
     worker_args = [
         'worker',
         f'--loglevel={args.loglevel}',
-        f'--concurrency={args.concurrency}',
+        f'--concurrency={concurrency}',
+        f'--pool={pool}',
+        f'--prefetch-multiplier={PREFETCH_MULTIPLIERS[args.queue]}',
+        # Hand tasks only to idle children, not ones stuck on a long scrape
+        '-O', 'fair',
+        f'--max-tasks-per-child={MAX_TASKS_PER_CHILD}',
+        f'--max-memory-per-child={MAX_MEMORY_PER_CHILD}',
+        # Single-node deployment: skip inter-worker chatter
+        '--without-gossip',
+        '--without-mingle',
+        '--without-heartbeat',
     ]
 
+    time_limits = TIME_LIMITS[args.queue]
+    if time_limits:
+        soft_time_limit, time_limit = time_limits
+        worker_args += [
+            f'--soft-time-limit={soft_time_limit}',
+            f'--time-limit={time_limit}',
+        ]
+
     # Add queue specification
     if args.queue == 'all':
         worker_args.append('--queues=geocoding,scraper,email')
@@ -61,7 +138,7 @@ def main():
     print(f"Starting Celery Worker")
     print("=" * 80)
     print(f"Queue(s): {args.queue}")
-    print(f"Concurrency: {args.concurrency}")
+    print(f"Concurrency: {concurrency} ({pool})")
     print(f"Log level: {args.loglevel}")
     print("=" * 80)
     print("\nPress Ctrl+C to stop\n")
@@ -1,7 +1,155 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timezone
 from scraper.utils import accept_cookies
+import logging
 import re
 import os
+import sys
+
+# Output goes to stdout like print(); scraper/run.py moves it onto its log
+# queue so it stays in order with the scraper's progress lines
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+if not log.handlers:
+    _log_stream = logging.StreamHandler(sys.stdout)
+    _log_stream.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_log_stream)
+
+
+# Only accept FULL UK postcodes with inward code (digit + 2 letters at end)
+# Format: AA9A 9AA, A9A 9AA, A9 9AA, A99 9AA, AA9 9AA, AA99 9AA
+# Examples: CM3 1NZ, SW1A 2AA, W1 2AB, EC1A 1BB
+# Rejects partial: CM3, KT19, SW1A
+# Letters are restricted per position (e.g. no C, I, K, M, O or V in the
+# inward code), so malformed tails like "ZZ9 9ZZ" are rejected here rather
+# than sent on to reverse geocoding. Compiled once; runs for every listing
+_FULL_POSTCODE_RE = re.compile(
+    r'^(GIR ?0AA|[A-PR-UWYZ][A-HK-Y0-9][A-HJKSTUW0-9]?[ABEHMNPRVWXY0-9]? ?[0-9][ABD-HJLN-UW-Z]{2})$',
+    re.IGNORECASE
+)
+
+# Dates, size, tenure and council tax band are plain text patterns, so they
+# are matched against the page text (read once) rather than element by element
+# "Added on 22/01/2026" / "Reduced on 22/01/2026", both found in one pass
+_DATE_RE = re.compile(r'(added|reduced) on (\d{2}/\d{2}/\d{4})', re.IGNORECASE)
+_SIZE_RE = re.compile(r'(\d[\d,]*)\s*(?:sq\s*ft|sq\s*m|m²|sqft|sqm)', re.IGNORECASE)
+_TENURE_LABEL_RE = re.compile(r'tenure\s*:?\s*(freehold|leasehold)\b', re.IGNORECASE)
+# A line that is just the value, as under a "TENURE" heading; a mention inside
+# running text ("share of freehold", "leasehold flat above") doesn't count
+_TENURE_LINE_RE = re.compile(r'^[ \t]*(freehold|leasehold)[ \t]*$', re.IGNORECASE | re.MULTILINE)
+# "Council Tax Band C", "COUNCIL TAX\nBand: D", ...
+_COUNCIL_TAX_BAND_RE = re.compile(r'council\s*tax.{0,40}?band\s*:?\s*([A-H])\b', re.IGNORECASE | re.DOTALL)
+_KEY_FEATURE_BAND_RE = re.compile(r'council.*tax.*band\s*([A-H])', re.IGNORECASE)
+
+# Characters stripped from price text before int(): "£300,000" -> "300000"
+_PRICE_TRANS = str.maketrans('', '', '£, \t\n\r')
+
+# Trimmed text of the first element matched by the first selector (in list
+# order) that has any; the selector lists are fallbacks in priority order
+_FIRST_TEXT_SCRIPT = r"""
+(selectors) => {
+    for (const selector of selectors) {
+        let el;
+        try {
+            el = document.querySelector(selector);
+        } catch (e) {
+            continue;
+        }
+        const text = el ? (el.innerText || '').trim() : '';
+        if (text) return text;
+    }
+    return null;
+}
+"""
+
+# The only PAGE_MODEL.propertyData fields used, read in one evaluate. Only
+# these are picked out: the full property data is large to serialize.
+_PAGE_MODEL_SCRIPT = r"""
+() => {
+    const data = window.PAGE_MODEL && window.PAGE_MODEL.propertyData;
+    if (!data) return null;
+    return {
+        prices: data.prices ? {displayPriceQualifier: data.prices.displayPriceQualifier} : null,
+        location: data.location ? {
+            latitude: data.location.latitude,
+            longitude: data.location.longitude,
+        } : null,
+        councilTaxBand: data.councilTaxBand || null,
+        keyFeatures: data.keyFeatures || null,
+    };
+}
+"""
+
+# Status needs the element structure (label selectors, short exact-match
+# elements), so it is still found in the browser, in one walk. The same call
+# returns the page text.
+_PAGE_SCAN_SCRIPT = r"""
+() => {
+    const STATUS_SELECTORS = [
+        'span[data-test="soldLabel"]',
+        'div[data-test="soldLabel"]',
+        'span.soldLabel',
+        'div.soldLabel',
+        'span[class*="sold"]',
+        'div[class*="sold"]',
+        'span[class*="STC"]',
+        'div[class*="STC"]',
+        '*[class*="propertyStatus"]',
+        '*[data-testid*="status"]',
+    ];
+    const EXACT_STATUSES = ['SOLD STC', 'SOLD', 'UNDER OFFER', 'LET AGREED', 'RESERVED', 'SSTC'];
+    // One case-insensitive test per element instead of upper-casing the text
+    // and checking each keyword/status in turn
+    const STATUS_KEYWORD_RE = /SOLD|STC|UNDER OFFER|LET AGREED|RESERVED/i;
+    const EXACT_STATUS_RE = new RegExp('^(' + EXACT_STATUSES.join('|') + ')$', 'i');
+
+    const result = {
+        status: null,
+        body_text: document.body.innerText,
+    };
+
+    // Status labels first. One query over all the label selectors (rather
+    // than one per selector); each hit is ranked by the first selector it
+    // matches, so the earliest selector still wins, then document order.
+    let statusRank = STATUS_SELECTORS.length;
+    for (const el of document.querySelectorAll(STATUS_SELECTORS.join(', '))) {
+        const rank = STATUS_SELECTORS.findIndex(selector => el.matches(selector));
+        if (rank >= statusRank) continue;
+        const text = (el.innerText || '').trim();
+        // Only accept short text (< 100 chars) to avoid capturing large sections
+        if (text && text.length < 100 && STATUS_KEYWORD_RE.test(text)) {
+            result.status = text;
+            statusRank = rank;
+            if (rank === 0) break;
+        }
+    }
+
+    // Otherwise look for exact status keywords in small elements. XPath lets
+    // the browser's own matcher pick the candidates (without layout), so
+    // innerText is only read for those instead of for every element. The
+    // search is scoped to the listing content when the page marks it, which
+    // skips headers, footers, cookie banners and ads.
+    if (!result.status) {
+        const root = document.querySelector('main, article, [data-testid="property-detail"]') || document.body;
+        const upperText = "translate(normalize-space(.), 'abcdefghijklmnopqrstuvwxyz', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ')";
+        const xpath = './/*[self::span or self::div or self::p or self::h1 or self::h2 or self::h3]['
+            + EXACT_STATUSES.map(status => `${upperText} = '${status}'`).join(' or ') + ']';
+        const candidates = document.evaluate(
+            xpath, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        for (let i = 0; i < candidates.snapshotLength; i++) {
+            const text = (candidates.snapshotItem(i).innerText || '').trim();
+            if (text && text.length <= 50 && EXACT_STATUS_RE.test(text)) {
+                result.status = text;
+                break;
+            }
+        }
+    }
+
+    return result;
+}
+"""
 
 
 def parse_address(address_str: str) -> dict:
@@ -29,17 +177,14 @@ def parse_address(address_str: str) -> dict:
 
     parts = [p.strip() for p in address_str.split(',')]
 
-    # Only accept FULL UK postcodes with inward code (digit + 2 letters at end)
-    # Format: AA9A 9AA, A9A 9AA, A9 9AA, A99 9AA, AA9 9AA, AA99 9AA
-    # Examples: CM3 1NZ, SW1A 2AA, W1 2AB, EC1A 1BB
-    # Rejects partial: CM3, KT19, SW1A
+    # Only accept FULL UK postcodes (see _FULL_POSTCODE_RE)
     postcode = None
-    full_postcode_pattern = r'^[A-Z]{1,2}\d{1,2}[A-Z]?\s?\d[A-Z]{2}$'
 
     if len(parts) > 0:
         # Check last part for FULL postcode
         last_part = parts[-1].strip()
-        if re.match(full_postcode_pattern, last_part, re.IGNORECASE):
+        # Full postcodes are 5-8 characters; partials like "KT19" skip the regex
+        if 5 <= len(last_part) <= 8 and _FULL_POSTCODE_RE.match(last_part):
             postcode = last_part
             parts = parts[:-1]
         # If partial postcode detected, leave as None for reverse geocoding
@@ -55,20 +200,74 @@ def parse_address(address_str: str) -> dict:
 
 
 
-async def extract_property_details(page, url):
+def parse_text_fields(body_text: str) -> tuple:
+    """
+    Match the text-only fields against a page's text
+
+    Returns: (added_on, reduced_on, size, tenure, council_tax_band)
+    """
+    def search(regex):
+        match = regex.search(body_text)
+        return match.group(1) if match else None
+
+    # First "added on" and first "reduced on" date, from one scan of the text
+    dates = {}
+    for match in _DATE_RE.finditer(body_text):
+        dates.setdefault(match.group(1).lower(), match.group(2))
+        if len(dates) == 2:
+            break
+
+    # Cheap substring check first: listings without a floor area never
+    # mention a unit, and then the regex (which tries every digit) is skipped
+    size = None
+    lower_text = body_text.lower()
+    if 'sq' in lower_text or 'm²' in lower_text:
+        size_str = search(_SIZE_RE)
+        size = int(size_str.replace(',', '')) if size_str else None
+
+    # An explicit "Tenure: ..." label, else a line holding only the value
+    tenure = search(_TENURE_LABEL_RE) or search(_TENURE_LINE_RE)
+
+    return (
+        dates.get('added'),
+        dates.get('reduced'),
+        size,
+        tenure.capitalize() if tenure else None,
+        search(_COUNCIL_TAX_BAND_RE),
+    )
+
+
+async def extract_property_details(page, url, timestamp=None):
     """
     Given a property URL, extract key info and full-size images
+
+    timestamp: scrape time to record (UTC); callers scraping a batch pass the
+    batch start time so every listing in it shares one. Defaults to now.
     """
     await page.goto(url, wait_until="domcontentloaded")
     await accept_cookies(page)
 
-    # Wait for page to fully load
-    await page.wait_for_timeout(2000)
+    # Wait until the page is actually ready instead of sleeping a fixed 2s:
+    # most fields come from PAGE_MODEL.propertyData, so that is the signal;
+    # pages without it are ready once the address heading has rendered
+    try:
+        await page.wait_for_function(
+            "() => window.PAGE_MODEL && window.PAGE_MODEL.propertyData",
+            timeout=10000
+        )
+    except Exception:
+        try:
+            await page.wait_for_selector(
+                'h1[itemprop="streetAddress"], h1[data-testid="address"]',
+                timeout=5000
+            )
+        except Exception as e:
+            log.info(f"[WARNING] Page not ready, extracting anyway: {e}")
 
     data = {
         "url": url,
         "property_id": url.split("/properties/")[1].split("/")[0],
-        "timestamp": datetime.utcnow(),  # Keep as datetime object, not string
+        "timestamp": timestamp or datetime.now(timezone.utc),  # Keep as datetime object, not string
     }
 
     async def get_text(selectors_list):
@@ -76,27 +275,106 @@ async def extract_property_details(page, url):
         if isinstance(selectors_list, str):
             selectors_list = [selectors_list]
 
-        for selector in selectors_list:
-            try:
-                el = await page.query_selector(selector)
-                if el:
-                    text = await el.inner_text()
-                    if text and text.strip():
-                        return text.strip()
-            except Exception as e:
-                print(f"Error with selector '{selector}': {e}")
-                continue
-
-        print(f"No match found for selectors: {selectors_list}")
+        # The whole fallback list is tried in the page, in priority order, in
+        # one call rather than a query + inner_text round-trip per selector
+        try:
+            text = await page.evaluate(_FIRST_TEXT_SCRIPT, selectors_list)
+        except Exception as e:
+            log.info(f"Error with selectors {selectors_list}: {e}")
+            return None
+
+        if text:
+            return text
+
+        log.info(f"No match found for selectors: {selectors_list}")
         return None
 
-    # 1. Price - try multiple possible selectors
-    price_text = await get_text([
-        'div[data-testid="primaryPrice"] span',
-        'div[data-testid="price"]',
-        'span._1gfnqJ3Vtd1z40MlC0MzXu span',
-        'div._1gfnqJ3Vtd1z40MlC0MzXu span'
-    ])
+    async def evaluate(script, description):
+        """Run an in-page script, returning None if it fails"""
+        try:
+            return await page.evaluate(script)
+        except Exception as e:
+            log.info(f"[WARNING] Failed to {description}: {e}")
+            return None
+
+    async def get_image_urls():
+        """
+        Image URLs from meta tags with itemprop="contentUrl", which hold every
+        property image regardless of lazy loading. All the content attributes
+        come back in one call rather than one get_attribute() per tag.
+        """
+        try:
+            return await page.eval_on_selector_all(
+                'meta[itemprop="contentUrl"]',
+                'metas => metas.map(meta => meta.getAttribute("content"))'
+            )
+        except Exception as e:
+            log.info(f"[WARNING] Failed to read images: {e}")
+            return []
+
+    # None of these reads depend on each other, so issue them together and
+    # let Playwright pipeline the round-trips instead of awaiting each in turn
+    (
+        page_model,
+        price_text,
+        full_address,
+        bedrooms,
+        property_type,
+        description,
+        scanned,
+        bathrooms,
+        image_urls,
+    ) = await asyncio.gather(
+        # Price qualifier, coordinates and council tax band all come from
+        # PAGE_MODEL.propertyData; read it once
+        evaluate(_PAGE_MODEL_SCRIPT, "read PAGE_MODEL"),
+        # 1. Price - try multiple possible selectors
+        get_text([
+            'div[data-testid="primaryPrice"] span',
+            'div[data-testid="price"]',
+            'span._1gfnqJ3Vtd1z40MlC0MzXu span',
+            'div._1gfnqJ3Vtd1z40MlC0MzXu span'
+        ]),
+        # 2. Address - try multiple possible selectors
+        get_text([
+            'h1[itemprop="streetAddress"]',
+            'h1._2uQQ3SV0eMHL1P6t5ZDo2q',
+            'h1[data-testid="address"]',
+            'div[itemprop="address"] h1'
+        ]),
+        # 3. Bedrooms - try multiple possible selectors
+        get_text([
+            'span[data-testid="info-reel-BEDROOMS-text"] p',
+            'span[data-testid="info-reel-BEDROOMS-text"]',
+            'dd:has(svg[data-testid="svg-bed"]) span p',
+            'span[data-testid="beds"]'
+        ]),
+        # 4. Property type - try multiple possible selectors
+        get_text([
+            'span[data-testid="info-reel-PROPERTY_TYPE-text"] p',
+            'span[data-testid="info-reel-PROPERTY_TYPE-text"]',
+            'li[data-testid="property-type"]'
+        ]),
+        # 5. Description - try multiple possible selectors
+        get_text([
+            'div.STw8udCxUaBUMfOOZu0iL',
+            'div._3nPVwR0HZYQah5tkVJHFh5',
+            'div[data-testid="description"]',
+            'div.OD0O7FWw1TjbTD4sdRi1_ div.STw8udCxUaBUMfOOZu0iL'
+        ]),
+        # 6. Status, plus the page text used for fields 8-12
+        evaluate(_PAGE_SCAN_SCRIPT, "scan page"),
+        # 7. Bathrooms
+        get_text([
+            'span[data-testid="info-reel-BATHROOMS-text"] p',
+            'span[data-testid="info-reel-BATHROOMS-text"]',
+            'dd:has(svg[data-testid="svg-bathroom"]) span p',
+        ]),
+        # 13. Images (full size only)
+        get_image_urls(),
+    )
+    page_model = page_model or {}
+    scanned = scanned or {}
 
     # Parse price to integer (remove £ and commas)
     def parse_price(price_str):
@@ -104,393 +382,97 @@ async def extract_property_details(page, url):
         if not price_str:
             return None
         try:
-            # Remove £ sign, commas, and any whitespace
-            clean_price = price_str.replace('£', '').replace(',', '').strip()
-            # Convert to integer
-            return int(clean_price)
+            # Remove £ sign, commas, and any whitespace (one pass), then convert
+            return int(price_str.translate(_PRICE_TRANS))
         except (ValueError, AttributeError):
-            print(f"[WARNING] Could not parse price: {price_str}")
+            log.info(f"[WARNING] Could not parse price: {price_str}")
             return None
 
     data["price"] = parse_price(price_text)
     data["price_text"] = price_text  # Keep original text for reference
 
     # 1b. Price qualifier (offer type) from PAGE_MODEL
-    async def get_price_qualifier():
-        """Extract price qualifier (e.g., 'Offers in Region of', 'Guide Price', etc.)"""
-        try:
-            qualifier_script = """
-            () => {
-                if (window.PAGE_MODEL && window.PAGE_MODEL.propertyData && window.PAGE_MODEL.propertyData.prices) {
-                    return window.PAGE_MODEL.propertyData.prices.displayPriceQualifier || null;
-                }
-                return null;
-            }
-            """
-            qualifier = await page.evaluate(qualifier_script)
-            if qualifier and qualifier.strip():
-                print(f"[DEBUG] Price qualifier found: {qualifier}")
-                return qualifier.strip()
-            return None
-        except Exception as e:
-            print(f"[WARNING] Failed to extract price qualifier: {e}")
-            return None
-
-    data["price_qualifier"] = await get_price_qualifier()
-
-    # 2. Address - try multiple possible selectors
-    full_address = await get_text([
-        'h1[itemprop="streetAddress"]',
-        'h1._2uQQ3SV0eMHL1P6t5ZDo2q',
-        'h1[data-testid="address"]',
-        'div[itemprop="address"] h1'
-    ])
-
+    # (e.g., 'Offers in Region of', 'Guide Price', etc.)
+    qualifier = (page_model.get("prices") or {}).get("displayPriceQualifier")
+    if qualifier and qualifier.strip():
+        log.info(f"[DEBUG] Price qualifier found: {qualifier}")
+        data["price_qualifier"] = qualifier.strip()
+    else:
+        data["price_qualifier"] = None
+
+    # 2. Address
     data["full_address"] = full_address
     data["address_parts"] = parse_address(full_address)
 
     # 7. Coordinates from PAGE_MODEL JSON
-    async def get_coordinates():
-        """Extract latitude and longitude from window.PAGE_MODEL JavaScript object"""
-        try:
-            # Extract coordinates from the PAGE_MODEL JavaScript object
-            coords_script = """
-            () => {
-                if (window.PAGE_MODEL && window.PAGE_MODEL.propertyData && window.PAGE_MODEL.propertyData.location) {
-                    return {
-                        latitude: window.PAGE_MODEL.propertyData.location.latitude,
-                        longitude: window.PAGE_MODEL.propertyData.location.longitude
-                    };
-                }
-                return null;
+    location = page_model.get("location") or {}
+    try:
+        if location.get("latitude") and location.get("longitude"):
+            latitude = float(location["latitude"])
+            longitude = float(location["longitude"])
+            log.info(f"[DEBUG] Coordinates found: {latitude}, {longitude}")
+            data["coordinates"] = {
+                "latitude": latitude,
+                "longitude": longitude
             }
-            """
-
-            coords = await page.evaluate(coords_script)
-
-            if coords and coords.get('latitude') and coords.get('longitude'):
-                latitude = float(coords['latitude'])
-                longitude = float(coords['longitude'])
-                print(f"[DEBUG] Coordinates found: {latitude}, {longitude}")
-                return {
-                    "latitude": latitude,
-                    "longitude": longitude
-                }
-            else:
-                print("[DEBUG] Coordinates not found in PAGE_MODEL.propertyData.location")
-                return {"latitude": None, "longitude": None}
-
-        except Exception as e:
-            print(f"[WARNING] Failed to extract coordinates: {e}")
-            import traceback
-            traceback.print_exc()
-            return {"latitude": None, "longitude": None}
-
-    data["coordinates"] = await get_coordinates()
-
-    # 3. Bedrooms - try multiple possible selectors
-    data["bedrooms"] = await get_text([
-        'span[data-testid="info-reel-BEDROOMS-text"] p',
-        'span[data-testid="info-reel-BEDROOMS-text"]',
-        'dd:has(svg[data-testid="svg-bed"]) span p',
-        'span[data-testid="beds"]'
-    ])
-
-    # 4. Property type - try multiple possible selectors
-    data["property_type"] = await get_text([
-        'span[data-testid="info-reel-PROPERTY_TYPE-text"] p',
-        'span[data-testid="info-reel-PROPERTY_TYPE-text"]',
-        'li[data-testid="property-type"]'
-    ])
-
-    # 5. Description - try multiple possible selectors
-    data["description"] = await get_text([
-        'div.STw8udCxUaBUMfOOZu0iL',
-        'div._3nPVwR0HZYQah5tkVJHFh5',
-        'div[data-testid="description"]',
-        'div.OD0O7FWw1TjbTD4sdRi1_ div.STw8udCxUaBUMfOOZu0iL'
-    ])
-
-    # 6. Property status (SOLD STC, UNDER OFFER, etc.)
-    async def get_status():
-        """Check multiple patterns for property status"""
-        # Try common selectors for small elements first
-        selectors = [
-            'span[data-test="soldLabel"]',
-            'div[data-test="soldLabel"]',
-            'span.soldLabel',
-            'div.soldLabel',
-            'span[class*="sold"]',
-            'div[class*="sold"]',
-            'span[class*="STC"]',
-            'div[class*="STC"]',
-            '*[class*="propertyStatus"]',
-            '*[data-testid*="status"]',
-        ]
-
-        for selector in selectors:
-            try:
-                elements = await page.query_selector_all(selector)
-                for el in elements:
-                    text = await el.inner_text()
-                    if text and text.strip():
-                        text = text.strip()
-                        # Only accept short text (< 100 chars) to avoid capturing large sections
-                        if len(text) < 100 and any(keyword in text.upper() for keyword in ['SOLD', 'STC', 'UNDER OFFER', 'LET AGREED', 'RESERVED']):
-                            print(f"[DEBUG] Found status '{text}' with selector: {selector}")
-                            return text
-            except Exception:
-                continue
-
-        # If not found, search all small text elements
-        try:
-            all_elements = await page.query_selector_all('span, div, p, h1, h2, h3')
-            for el in all_elements:
-                try:
-                    text = await el.inner_text()
-                    if text:
-                        text = text.strip()
-                        # Look for exact matches of status keywords in short text
-                        if len(text) <= 50:  # Only check small elements
-                            if text.upper() in ['SOLD STC', 'SOLD', 'UNDER OFFER', 'LET AGREED', 'RESERVED', 'SSTC']:
-                                print(f"[DEBUG] Found exact status match: {text}")
-                                return text
-                except Exception:
-                    continue
-        except Exception:
-            pass
-
-        return None
-
-    data["status"] = await get_status()
+        else:
+            log.info("[DEBUG] Coordinates not found in PAGE_MODEL.propertyData.location")
+            data["coordinates"] = {"latitude": None, "longitude": None}
+    except (TypeError, ValueError) as e:
+        log.info(f"[WARNING] Failed to extract coordinates: {e}")
+        data["coordinates"] = {"latitude": None, "longitude": None}
+
+    # 3-5. Bedrooms, property type, description
+    data["bedrooms"] = bedrooms
+    data["property_type"] = property_type
+    data["description"] = description
+
+    # 6. Status
+    data["status"] = scanned.get("status")
+    if data["status"]:
+        log.info(f"[DEBUG] Found status: {data['status']}")
 
     # 7. Bathrooms
-    data["bathrooms"] = await get_text([
-        'span[data-testid="info-reel-BATHROOMS-text"] p',
-        'span[data-testid="info-reel-BATHROOMS-text"]',
-        'dd:has(svg[data-testid="svg-bathroom"]) span p',
-    ])
-
-    # 8. Added on date
-    async def get_added_on():
-        """Extract 'Added on' date"""
-        try:
-            # Search all elements for "Added on" text
-            elements = await page.query_selector_all('div, p, span')
-            for el in elements:
-                try:
-                    text = await el.inner_text()
-                    if text and 'added on' in text.lower():
-                        # Extract date from "Added on 22/01/2026"
-                        date_match = re.search(r'added on (\d{2}/\d{2}/\d{4})', text, re.IGNORECASE)
-                        if date_match:
-                            date_str = date_match.group(1)
-                            print(f"[DEBUG] Added on date found: {date_str}")
-                            return date_str
-                except Exception:
-                    continue
-        except Exception as e:
-            print(f"[DEBUG] Could not extract 'Added on' date: {e}")
-        return None
-
-    data["added_on"] = await get_added_on()
-
-    # 9. Reduced on date
-    async def get_reduced_on():
-        """Extract 'Reduced on' date"""
-        try:
-            # Search all elements for "Reduced on" text
-            elements = await page.query_selector_all('div, p, span')
-            for el in elements:
-                try:
-                    text = await el.inner_text()
-                    if text and 'reduced on' in text.lower():
-                        # Extract date from "Reduced on 22/01/2026"
-                        date_match = re.search(r'reduced on (\d{2}/\d{2}/\d{4})', text, re.IGNORECASE)
-                        if date_match:
-                            date_str = date_match.group(1)
-                            print(f"[DEBUG] Reduced on date found: {date_str}")
-                            return date_str
-                except Exception:
-                    continue
-        except Exception as e:
-            print(f"[DEBUG] Could not extract 'Reduced on' date: {e}")
-        return None
-
-    data["reduced_on"] = await get_reduced_on()
-
-    # 10. Property size (sq ft or sq m)
-    async def get_size():
-        """Extract property size as integer (numeric value only)"""
-        try:
-            # Search all elements for size information
-            elements = await page.query_selector_all('dt, dd, p, span, div')
-            for el in elements:
-                try:
-                    text = await el.inner_text()
-                    if not text:
-                        continue
-
-                    text = text.strip()
-
-                    # Look for patterns like "1,200 sq ft", "120 m²", "100 sq m"
-                    if len(text) < 100:  # Avoid large text blocks
-                        # Match patterns with numbers and size units
-                        size_match = re.search(r'(\d+[,\s]*\d*)\s*(sq\s*ft|sq\s*m|m²|sqft|sqm)', text, re.IGNORECASE)
-                        if size_match:
-                            # Extract numeric part and remove commas/spaces
-                            size_str = size_match.group(1).replace(',', '').replace(' ', '')
-                            size_int = int(size_str)
-                            print(f"[DEBUG] Property size found: {size_int} (from '{text.strip()}')")
-                            return size_int
-                except Exception:
-                    continue
-        except Exception as e:
-            print(f"[DEBUG] Could not extract size: {e}")
-        return None
-
-    data["size"] = await get_size()
-
-    # 11. Tenure (Freehold/Leasehold)
-    async def get_tenure():
-        """Extract tenure information"""
-        try:
-            # Search all elements for tenure information
-            elements = await page.query_selector_all('dt, dd, p, span, div')
-            for el in elements:
-                try:
-                    text = await el.inner_text()
-                    if not text:
-                        continue
-
-                    text = text.strip()
-
-                    # Look for TENURE label or direct mentions
-                    if 'tenure' in text.lower() or len(text) < 30:
-                        # Check for Freehold or Leasehold
-                        if 'freehold' in text.lower():
-                            print(f"[DEBUG] Tenure: Freehold")
-                            return 'Freehold'
-                        elif 'leasehold' in text.lower():
-                            print(f"[DEBUG] Tenure: Leasehold")
-                            return 'Leasehold'
-                except Exception:
-                    continue
-        except Exception as e:
-            print(f"[DEBUG] Could not extract tenure: {e}")
-        return None
-
-    data["tenure"] = await get_tenure()
-
-    # 12. Council tax band
-    async def get_council_tax_band():
-        """Extract council tax band (A-H)"""
-        try:
-            # Strategy 1: Look for specific dt/dd pairs with COUNCIL TAX
-            council_elements = await page.query_selector_all('dt, dd, p, span, div')
-
-            for el in council_elements:
-                try:
-                    text = await el.inner_text()
-                    if not text:
-                        continue
-
-                    text = text.strip()
-
-                    # Look for council tax band patterns
-                    # Matches: "Band A", "Band: D", "Tax Band B", "Council Tax Band C", etc.
-                    if 'council' in text.lower() and 'tax' in text.lower() and 'band' in text.lower():
-                        # Extract band letter (with optional colon)
-                        band_match = re.search(r'band\s*:?\s*([A-H])', text, re.IGNORECASE)
-                        if band_match:
-                            band = band_match.group(1).upper()
-                            print(f"[DEBUG] Council tax band found: {band}")
-                            return band
-
-                    # Also check for standalone "Band X" or "Band: X" near council tax labels
-                    elif 'band' in text.lower() and len(text) < 20:
-                        # Short text like "Band A", "Band: D" or just "A"
-                        band_match = re.search(r'band\s*:?\s*([A-H])|^([A-H])$', text, re.IGNORECASE)
-                        if band_match:
-                            band = (band_match.group(1) or band_match.group(2)).upper()
-                            # Verify this is near council tax by checking nearby elements
-                            parent = await el.evaluate_handle('el => el.parentElement')
-                            if parent:
-                                parent_text = await parent.inner_text()
-                                if 'council' in parent_text.lower():
-                                    print(f"[DEBUG] Council tax band found (parent check): {band}")
-                                    return band
-
-                except Exception:
-                    continue
-
-            # Strategy 2: Use JavaScript to search PAGE_MODEL
-            try:
-                council_script = """
-                () => {
-                    // Check if council tax band is in the page model
-                    if (window.PAGE_MODEL && window.PAGE_MODEL.propertyData) {
-                        const data = window.PAGE_MODEL.propertyData;
-
-                        // Check various possible locations
-                        if (data.councilTaxBand) return data.councilTaxBand;
-                        if (data.keyFeatures) {
-                            for (const feature of data.keyFeatures) {
-                                const match = feature.match(/council.*tax.*band\s*([A-H])/i);
-                                if (match) return match[1];
-                            }
-                        }
-                    }
-
-                    // Search all text content for council tax band
-                    const allText = document.body.innerText;
-                    const match = allText.match(/council.*tax.*band\s*([A-H])/i);
-                    if (match) return match[1];
-
-                    return null;
-                }
-                """
-                band = await page.evaluate(council_script)
-                if band:
-                    band = band.upper()
-                    print(f"[DEBUG] Council tax band found via JavaScript: {band}")
-                    return band
-            except Exception as e:
-                print(f"[DEBUG] JavaScript council tax extraction failed: {e}")
-
-        except Exception as e:
-            print(f"[DEBUG] Could not extract council tax band: {e}")
-
-        return None
-
-    data["council_tax_band"] = await get_council_tax_band()
-
-    # 13. Images (full size only)
-    full_images = []
-
-    # Extract images from meta tags with itemprop="contentUrl"
-    # These contain all property images regardless of lazy loading
-    meta_elements = await page.query_selector_all('meta[itemprop="contentUrl"]')
-    print(f"[DEBUG] Found {len(meta_elements)} meta tags with itemprop='contentUrl'")
-
-    for meta in meta_elements:
-        url = await meta.get_attribute("content")
-        if not url:
-            continue
-
-        print(f"[DEBUG] Meta image URL: {url[:80]}...")
-
-        # Accept all images from media.example.co.uk
-        # This includes both patterns:
-        # - https://media.example.com/id/...
-        # - https://media.example.com/id/...
-        if "media.example.com" in url and url.endswith(('.jpeg', '.jpg', '.png')):
-            full_images.append(url)
-
-    print(f"[DEBUG] Captured {len(full_images)} full images")
-
-    # Deduplicate while preserving order
-    unique_full_images = list(dict.fromkeys(full_images))
+    data["bathrooms"] = bathrooms
+
+    # 8-12. Added on, reduced on, size, tenure and council tax band, matched
+    # against the page text read by the scan
+    (
+        data["added_on"],
+        data["reduced_on"],
+        data["size"],
+        data["tenure"],
+        band,
+    ) = parse_text_fields(scanned.get("body_text") or "")
+
+    # Fall back to the page model's own band, or one mentioned in its key features
+    if not band:
+        band = page_model.get("councilTaxBand")
+    if not band:
+        for feature in page_model.get("keyFeatures") or []:
+            match = isinstance(feature, str) and _KEY_FEATURE_BAND_RE.search(feature)
+            if match:
+                band = match.group(1)
+                break
+    data["council_tax_band"] = band.upper() if band else None
+
+    for label, key in [
+        ("Added on date", "added_on"),
+        ("Reduced on date", "reduced_on"),
+        ("Property size", "size"),
+        ("Tenure", "tenure"),
+        ("Council tax band", "council_tax_band"),
+    ]:
+        if data[key] is not None:
+            log.info(f"[DEBUG] {label} found: {data[key]}")
+
+    # 13. Images - accept all full-size images from media.example.com,
+    # deduplicated while preserving order
+    unique_full_images = list(dict.fromkeys(
+        url for url in image_urls
+        if url and "media.example.com" in url and url.endswith(('.jpeg', '.jpg', '.png'))
+    ))
+    log.info(f"[DEBUG] Captured {len(unique_full_images)} full images")
 
     data["images"] = {
         "count": len(unique_full_images),
@@ -1,44 +1,83 @@
 import asyncio
-from playwright.async_api import async_playwright
-from urllib.parse import parse_qs, urlparse
-from scraper.utils import accept_cookies
+import atexit
+import logging
+import re
+import sys
+from datetime import datetime, timezone
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from urllib.parse import unquote_plus
+from scraper.utils import accept_cookies, block_heavy_resources, set_strict_timeouts
 from scraper.property_parser import extract_property_details
 from scraper.search_urls import get_enabled_urls, get_url_count, PAGE_SIZE, MAX_PAGES
 from db.database import DatabaseConnector
 from db.config import DB_CONFIG
 
-# Browser restart configuration
-# Restart browser every N properties to prevent memory exhaustion
-BROWSER_RESTART_INTERVAL = 75  # Restart after processing this many properties
-
-
+# Progress output goes through a queue and is written by a background thread,
+# so a slow stdout pipe never stalls the event loop the extraction workers share
+log = logging.getLogger("scraper.run")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = SimpleQueue()
+_log_handler = QueueHandler(_log_queue)
+log.addHandler(_log_handler)
+# The database and parser modules log through the same queue, so their
+# [SKIP]/[ERROR]/[CHANGE] lines stay in order with the progress lines
+for _name in ("db.database", "scraper.property_parser", "scraper.utils"):
+    _logger = logging.getLogger(_name)
+    _logger.setLevel(logging.INFO)
+    _logger.propagate = False
+    _logger.handlers[:] = [_log_handler]
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Browser context recycling configuration
+# Extraction contexts are closed and reopened every N properties to free
+# renderer memory; the browser process itself stays up
+CONTEXT_RECYCLE_INTERVAL = 75  # Recycle after processing this many properties
+
+# Properties extracted at once per search, each worker on its own browser
+# context (pages are mostly network wait, so this is near-linear)
+EXTRACT_CONCURRENCY = 8
+
+# Scraped properties written to the database per batch (one COPY each)
+INSERT_BATCH_SIZE = 50
+
+# Re-run guard: properties the scraper saw (inserted or found unchanged) less
+# than this long ago are not re-fetched, so a price cut made within this
+# window is picked up by the first run after it
+RECENT_SEEN_HOURS = 6
+
+# Query parameters the town name is read from
+_DISPLAY_LOCATION_RE = re.compile(r'[?&]displayLocationIdentifier=([^&#]*)')
+_LOCATION_RE = re.compile(r'[?&]locationIdentifier=([^&#]*)')
+
+
+@lru_cache(maxsize=256)
 def extract_town_from_url(url: str) -> str:
     """
     Extract town name from the third-party property listing portal search URL
     """
-    try:
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-
-        # Try to get displayLocationIdentifier parameter
-        if 'displayLocationIdentifier' in params:
-            town = params['displayLocationIdentifier'][0]
-            # Remove .html suffix if present
-            if town.endswith('.html'):
-                town = town[:-5]
-            return town
-
-        # Fallback: try to get from locationIdentifier
-        if 'locationIdentifier' in params:
-            location_id = params['locationIdentifier'][0]
-            # Extract town name from identifier if possible
-            return location_id.split('^')[-1] if '^' in location_id else location_id
-
-        # Default if can't extract
-        return "Unknown"
-    except Exception as e:
-        print(f"[WARNING] Failed to extract town from URL: {e}")
-        return "Unknown"
+    # Try to get displayLocationIdentifier parameter
+    match = _DISPLAY_LOCATION_RE.search(url)
+    if match and match.group(1):
+        # Remove .html suffix if present
+        return unquote_plus(match.group(1)).removesuffix('.html')
+
+    # Fallback: try to get from locationIdentifier
+    match = _LOCATION_RE.search(url)
+    if match and match.group(1):
+        location_id = unquote_plus(match.group(1))
+        # Extract town name from identifier if possible
+        return location_id.split('^')[-1] if '^' in location_id else location_id
+
+    # Default if can't extract
+    return "Unknown"
 
 
 async def collect_property_links(page, base_url, page_size=24, max_pages=50):
@@ -51,153 +90,239 @@ async def collect_property_links(page, base_url, page_size=24, max_pages=50):
         page_size: Number of results per page
         max_pages: Maximum number of pages to scrape
     """
-    property_links = set()
+    # Listing paths seen so far; dict keys dedupe and keep discovery order,
+    # and the site prefix is only added once at the end
+    property_links = {}
 
     # Remove existing index parameter from base URL to avoid duplicates
     if '&index=' in base_url or '?index=' in base_url:
         # Split on index parameter and take everything before it
-        base_url = base_url.split('&index=')[0].split('?index=')[0]
+        base_url = base_url.partition('&index=')[0].partition('?index=')[0]
+
+    # The cookie banner is dismissed on the first page that actually loads
+    cookies_handled = False
 
     for page_num in range(max_pages):
         offset = page_num * page_size
         page_url = f"{base_url}&index={offset}"
 
-        print(f"  [Page {page_num + 1}] Scraping search results (index={offset})")
-        await page.goto(page_url, wait_until="domcontentloaded")
+        log.info(f"  [Page {page_num + 1}] Scraping search results (index={offset})")
+        # Return as soon as the navigation commits; the result cards below are
+        # the real readiness signal
+        try:
+            await page.goto(page_url, wait_until="commit")
+        except PlaywrightTimeoutError:
+            log.info(f"  [Page {page_num + 1}] Timed out loading search results, skipping page")
+            continue
 
-        if page_num == 0:
+        if not cookies_handled:
             await accept_cookies(page)
+            cookies_handled = True
 
-        # Wait for DOM to settle (increased for headless mode)
-        await page.wait_for_timeout(3000)
-
-        # Try to wait for search results to load
+        # Try to wait for search results to load; returns as soon as the
+        # first card is in the DOM, without waiting for it to become visible
         try:
-            await page.wait_for_selector('.propertyCard-wrapper, .propertyCard', timeout=5000)
+            await page.locator('.propertyCard-wrapper, .propertyCard').first.wait_for(state="attached", timeout=8000)
         except:
-            print(f"  [Page {page_num + 1}] Warning: propertyCard selector not found, continuing anyway...")
+            log.info(f"  [Page {page_num + 1}] Warning: propertyCard selector not found, continuing anyway...")
 
-        links = await page.query_selector_all('a[href^="/properties/"]')
-
-        if not links:
-            print(f"  [Page {page_num + 1}] No property links found. Ending pagination.")
+        # One card being attached doesn't mean the rest of the results HTML
+        # has been parsed; wait for the whole document before reading links
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=8000)
+        except PlaywrightTimeoutError:
+            log.info(f"  [Page {page_num + 1}] Warning: results page still loading, links may be incomplete")
+
+        # Read every result href in one call rather than one round-trip per link
+        hrefs = await page.eval_on_selector_all(
+            'a[href^="/properties/"]',
+            '(els) => els.map(e => e.getAttribute("href"))'
+        )
+
+        if not hrefs:
+            log.info(f"  [Page {page_num + 1}] No property links found. Ending pagination.")
             break
 
         before = len(property_links)
 
-        for link in links:
-            href = await link.get_attribute("href")
+        for href in hrefs:
             if not href:
                 continue
 
             if "/properties/" in href:
-                clean = href.split("#")[0].split("?")[0]
-                property_links.add("https://www.example.com" + clean)
+                clean = href.partition("#")[0].partition("?")[0]
+                property_links[clean] = None
 
         after = len(property_links)
-        print(f"  [Page {page_num + 1}] New properties found: {after - before}")
+        log.info(f"  [Page {page_num + 1}] New properties found: {after - before}")
 
         # If this page produced nothing new → stop
         if after == before:
-            print(f"  [Page {page_num + 1}] No new properties. Pagination complete.")
+            log.info(f"  [Page {page_num + 1}] No new properties. Pagination complete.")
             break
 
-    return list(property_links)
+    prefix = "https://www.example.com"
+    return [prefix + path for path in property_links]
 
 
-async def scrape_search_url(page, db, search_config, search_num, total_searches, browser=None, playwright_instance=None):
+async def scrape_search_url(page, db, search_config, search_num, total_searches):
     """
     Scrape a single search URL
 
     Args:
-        page: Playwright page object
+        page: Playwright page object (used to collect the search result links)
         db: Database connector
         search_config: Search configuration dict
         search_num: Current search number (1-indexed)
         total_searches: Total number of searches
-        browser: Browser instance (for restart capability)
-        playwright_instance: Playwright instance (for restart capability)
     """
     url = search_config["url"]
     description = search_config.get("description", "No description")
 
-    print("\n" + "=" * 80)
-    print(f"SEARCH {search_num}/{total_searches}: {description}")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info(f"SEARCH {search_num}/{total_searches}: {description}")
+    log.info("=" * 80)
 
     # Extract town from URL
     town_name = extract_town_from_url(url)
-    print(f"[INFO] Location: {town_name}")
+    log.info(f"[INFO] Location: {town_name}")
 
     # Collect property links
-    print(f"[INFO] Collecting property links...")
+    log.info(f"[INFO] Collecting property links...")
     property_links = await collect_property_links(page, url, PAGE_SIZE, MAX_PAGES)
 
-    print(f"\n[INFO] Found {len(property_links)} unique properties for this search")
+    log.info(f"\n[INFO] Found {len(property_links)} unique properties for this search")
+
+    # Skip properties already seen recently; the ID is in the URL, so one
+    # query saves a page load for each of them
+    url_ids = {prop_url: prop_url.partition("/properties/")[2].partition("/")[0] for prop_url in property_links}
+    recent_ids = await db.get_recently_seen(list(set(url_ids.values())), RECENT_SEEN_HOURS)
+    to_extract = [prop_url for prop_url in property_links if url_ids[prop_url] not in recent_ids]
+    if recent_ids:
+        log.info(f"[INFO] Skipping {len(property_links) - len(to_extract)} properties seen in the last {RECENT_SEEN_HOURS}h")
 
-    # Scrape each property
+    # Scrape each property; all share the batch start as their timestamp
+    batch_timestamp = datetime.now(timezone.utc)
     results = []
-    inserted_count = 0
-    skipped_count = 0
-    error_count = 0
-
-    for i, prop_url in enumerate(property_links, 1):
-        # Browser restart logic - restart every N properties to prevent memory exhaustion
-        if browser and playwright_instance and i > 1 and (i - 1) % BROWSER_RESTART_INTERVAL == 0:
-            print(f"\n[BROWSER RESTART] Restarting browser after {i-1} properties (memory management)")
-            try:
-                await page.close()
-                await browser.close()
-                browser = await playwright_instance.chromium.launch(headless=True)
-                page = await browser.new_page()
-                print("[BROWSER RESTART] Browser restarted successfully")
-            except Exception as e:
-                print(f"[WARNING] Browser restart failed: {e}, continuing with existing browser")
-
-        print(f"\n[{i}/{len(property_links)}] Extracting: {prop_url}")
-        try:
-            data = await extract_property_details(page, prop_url)
-            results.append(data)
+    counts = {"inserted": 0, "skipped": len(property_links) - len(to_extract), "errors": 0}
+    total = len(to_extract)
+    pending = []
+    image_jobs = []
+    browser = page.context.browser
+
+    async def flush_pending():
+        """Save buffered properties in one batch, then queue their image downloads"""
+        batch = pending[:]
+        pending.clear()
+        if not batch:
+            return
 
-            # Save to database
-            success, status = await db.insert_property(data, town_name)
+        try:
+            statuses = await db.insert_properties_bulk(batch, town_name)
+        except Exception as e:
+            # Never let a failed write escape into a worker or the search:
+            # every property of the batch counts as an error
+            log.info(f"  [ERROR] Failed to save batch of {len(batch)} properties: {e}")
+            counts["errors"] += len(batch)
+            return
+
+        for data, (success, status) in zip(batch, statuses):
+            property_id = data.get('property_id')
             if success:
                 if status == 'inserted':
-                    inserted_count += 1
-                    print(f"  [OK] New snapshot saved: {data.get('property_id')}")
+                    counts["inserted"] += 1
+                    log.info(f"  [OK] New snapshot saved: {property_id}")
                 elif status == 'skipped':
-                    skipped_count += 1
-                    print(f"  [SKIP] No changes: {data.get('property_id')}")
-
-                # Emit task to download and store images if available
-                if data.get('images') and data['images'].get('full'):
-                    image_urls = data['images']['full']
-                    try:
-                        from workers.image_tasks import download_property_images
-                        task = download_property_images.delay(
-                            property_id=data['property_id'],
-                            image_urls=image_urls
-                        )
-                        print(f"  [IMAGES] Queued {len(image_urls)} images for processing (Task: {task.id})")
-                    except Exception as e:
-                        print(f"  [WARNING] Failed to queue image task: {e}")
+                    counts["skipped"] += 1
+                    log.info(f"  [SKIP] No changes: {property_id}")
+
+                # Collect image downloads; they are queued together once the search is done
+                image_urls = (data.get('images') or {}).get('full')
+                if image_urls:
+                    image_jobs.append((property_id, image_urls))
             else:
-                error_count += 1
-                print(f"  [ERROR] Failed to save: {data.get('property_id')}")
+                counts["errors"] += 1
+                log.info(f"  [ERROR] Failed to save: {property_id}")
+
+    async def extract_worker(queue):
+        """Scrape queued URLs on this worker's own browser context until the queue is empty"""
+        context = await browser.new_context()
+        set_strict_timeouts(context)
+        await block_heavy_resources(context)
+        worker_page = await context.new_page()
 
+        try:
+            while True:
+                try:
+                    i, prop_url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                log.info(f"\n[{i}/{total}] Extracting: {prop_url}")
+                try:
+                    data = await extract_property_details(worker_page, prop_url, batch_timestamp)
+                    results.append(data)
+
+                    # Buffer for the next batched database write
+                    pending.append(data)
+                    if len(pending) >= INSERT_BATCH_SIZE:
+                        await flush_pending()
+
+                except PlaywrightTimeoutError as e:
+                    log.info(f"  [ERROR] Timed out extracting property: {e}")
+                    counts["errors"] += 1
+                except Exception as e:
+                    log.info(f"  [ERROR] Failed to extract property: {e}")
+                    counts["errors"] += 1
+        finally:
+            await context.close()
+
+    # Extract in rounds of CONTEXT_RECYCLE_INTERVAL properties, each spread over
+    # EXTRACT_CONCURRENCY workers; every worker closes its context when its round
+    # ends, so each round starts on fresh contexts
+    for start in range(0, total, CONTEXT_RECYCLE_INTERVAL):
+        if start > 0:
+            log.info(f"\n[CONTEXT RECYCLE] Fresh browser contexts after {start} properties (memory management)")
+
+        queue = asyncio.Queue()
+        batch = to_extract[start:start + CONTEXT_RECYCLE_INTERVAL]
+        for i, prop_url in enumerate(batch, start + 1):
+            queue.put_nowait((i, prop_url))
+
+        await asyncio.gather(*(
+            extract_worker(queue) for _ in range(min(EXTRACT_CONCURRENCY, len(batch)))
+        ))
+
+    # Save whatever is left in the buffer
+    await flush_pending()
+
+    # Emit one group of tasks to download and store the images of this search
+    if image_jobs:
+        try:
+            from celery import group
+            from workers.image_tasks import download_property_images
+            group_result = group(
+                download_property_images.s(property_id=property_id, image_urls=image_urls)
+                for property_id, image_urls in image_jobs
+            ).apply_async()
+            image_count = sum(len(image_urls) for _, image_urls in image_jobs)
+            log.info(f"[IMAGES] Queued {image_count} images from {len(image_jobs)} properties for processing (Group: {group_result.id})")
         except Exception as e:
-            print(f"  [ERROR] Failed to extract property: {e}")
-            error_count += 1
+            log.info(f"[WARNING] Failed to queue image tasks: {e}")
+
+    inserted_count = counts["inserted"]
+    skipped_count = counts["skipped"]
+    error_count = counts["errors"]
 
     # Summary for this search
-    print("\n" + "-" * 80)
-    print(f"SEARCH {search_num} COMPLETE: {description}")
-    print("-" * 80)
-    print(f"  • Properties found: {len(property_links)}")
-    print(f"  • New snapshots: {inserted_count}")
-    print(f"  • Skipped (no changes): {skipped_count}")
-    print(f"  • Errors: {error_count}")
-    print("-" * 80)
+    log.info("\n" + "-" * 80)
+    log.info(f"SEARCH {search_num} COMPLETE: {description}")
+    log.info("-" * 80)
+    log.info(f"  • Properties found: {len(property_links)}")
+    log.info(f"  • New snapshots: {inserted_count}")
+    log.info(f"  • Skipped (no changes): {skipped_count}")
+    log.info(f"  • Errors: {error_count}")
+    log.info("-" * 80)
 
     return {
         "description": description,
@@ -205,98 +330,113 @@ async def scrape_search_url(page, db, search_config, search_num, total_searches,
         "found": len(property_links),
         "inserted": inserted_count,
         "skipped": skipped_count,
-        "errors": error_count,
-        "page": page,  # Return updated page reference
-        "browser": browser  # Return updated browser reference
+        "errors": error_count
     }
 
 
-async def main():
-    """Main scraper function - processes all enabled search URLs"""
+async def scrape_all_searches(browser, db, search_configs):
+    """Run every search on one results page of the given browser"""
+    page = await browser.new_page()
+    set_strict_timeouts(page)
+    await block_heavy_resources(page)
+
+    results = []
+    try:
+        total_searches = len(search_configs)
+        for i, search_config in enumerate(search_configs, 1):
+            result = await scrape_search_url(page, db, search_config, i, total_searches)
+            results.append(result)
+    finally:
+        await page.close()
+
+    return results
+
+
+async def main(db=None, browser=None):
+    """
+    Main scraper function - processes all enabled search URLs
+
+    A long-lived worker passes in its already-open database connector and
+    browser so they are reused between runs; otherwise both are created here
+    and closed when the run ends.
+    """
 
     # Get enabled search URLs
     search_configs = get_enabled_urls()
     total_searches = len(search_configs)
 
     if total_searches == 0:
-        print("[ERROR] No enabled search URLs found!")
-        print("Please add search URLs to scraper/search_urls.py")
+        log.info("[ERROR] No enabled search URLs found!")
+        log.info("Please add search URLs to scraper/search_urls.py")
         return
 
-    print("\n" + "=" * 80)
-    print("SCRAPER - MULTI-URL MODE")
-    print("=" * 80)
-    print(f"Total search URLs to process: {total_searches}")
+    log.info("\n" + "=" * 80)
+    log.info("SCRAPER - MULTI-URL MODE")
+    log.info("=" * 80)
+    log.info(f"Total search URLs to process: {total_searches}")
     for i, config in enumerate(search_configs, 1):
-        print(f"  {i}. {config.get('description', 'No description')}")
-    print("=" * 80)
+        log.info(f"  {i}. {config.get('description', 'No description')}")
+    log.info("=" * 80)
 
     # Initialize database connection
-    db = DatabaseConnector()
-    try:
-        await db.connect(**DB_CONFIG)
-        await db.init_schema()
-        print("[OK] Database connected")
-    except Exception as e:
-        print(f"[ERROR] Failed to connect to database: {e}")
-        print("  Please ensure PostgreSQL is running and credentials are correct.")
-        print("  You can set credentials in db/config.py or via environment variables.")
-        return
-
-    # Initialize browser
-    async with async_playwright() as p:
-        # Use headless mode when running in Docker/worker environment
-        # headless=True is required for running in containers without display
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-
-        # Process each search URL
-        results = []
-        for i, search_config in enumerate(search_configs, 1):
-            result = await scrape_search_url(
-                page, db, search_config, i, total_searches,
-                browser=browser, playwright_instance=p
-            )
-            # Update browser and page references (may have been restarted during scraping)
-            page = result.get("page", page)
-            browser = result.get("browser", browser)
-            results.append(result)
-
-        await browser.close()
+    own_db = db is None
+    if own_db:
+        db = DatabaseConnector()
+        try:
+            await db.connect(**DB_CONFIG)
+            await db.init_schema()
+            log.info("[OK] Database connected")
+        except Exception as e:
+            log.info(f"[ERROR] Failed to connect to database: {e}")
+            log.info("  Please ensure PostgreSQL is running and credentials are correct.")
+            log.info("  You can set credentials in db/config.py or via environment variables.")
+            return
+
+    if browser is None:
+        # Initialize browser
+        async with async_playwright() as p:
+            # Use headless mode when running in Docker/worker environment
+            # headless=True is required for running in containers without display
+            browser = await p.chromium.launch(headless=True)
+            results = await scrape_all_searches(browser, db, search_configs)
+            await browser.close()
+    else:
+        results = await scrape_all_searches(browser, db, search_configs)
 
     # Final summary
-    print("\n" + "=" * 80)
-    print("SCRAPING COMPLETE - ALL SEARCHES PROCESSED")
-    print("=" * 80)
+    log.info("\n" + "=" * 80)
+    log.info("SCRAPING COMPLETE - ALL SEARCHES PROCESSED")
+    log.info("=" * 80)
 
     total_found = sum(r["found"] for r in results)
     total_inserted = sum(r["inserted"] for r in results)
     total_skipped = sum(r["skipped"] for r in results)
     total_errors = sum(r["errors"] for r in results)
 
-    print("\nSummary by Search:")
+    log.info("\nSummary by Search:")
     for i, result in enumerate(results, 1):
-        print(f"\n  {i}. {result['description']} ({result['town']})")
-        print(f"     Found: {result['found']} | Inserted: {result['inserted']} | Skipped: {result['skipped']} | Errors: {result['errors']}")
+        log.info(f"\n  {i}. {result['description']} ({result['town']})")
+        log.info(f"     Found: {result['found']} | Inserted: {result['inserted']} | Skipped: {result['skipped']} | Errors: {result['errors']}")
 
-    print("\n" + "-" * 80)
-    print("TOTALS:")
-    print(f"  • Total properties found: {total_found}")
-    print(f"  • New snapshots created: {total_inserted}")
-    print(f"  • Skipped (no changes): {total_skipped}")
-    print(f"  • Errors: {total_errors}")
-    print("-" * 80)
+    log.info("\n" + "-" * 80)
+    log.info("TOTALS:")
+    log.info(f"  • Total properties found: {total_found}")
+    log.info(f"  • New snapshots created: {total_inserted}")
+    log.info(f"  • Skipped (no changes): {total_skipped}")
+    log.info(f"  • Errors: {total_errors}")
+    log.info("-" * 80)
 
     # Show database stats
     stats = await db.get_stats()
-    print(f"\nDatabase Statistics:")
-    print(f"  • Total snapshots: {stats['total_snapshots']}")
-    print(f"  • Unique properties: {stats['unique_properties']}")
-    print(f"  • Average price: {stats['average_price']}")
-    print(f"  • Properties with price changes: {stats['properties_with_price_changes']}")
-    print("=" * 80)
-
-    await db.disconnect()
+    log.info(f"\nDatabase Statistics:")
+    log.info(f"  • Total snapshots: {stats['total_snapshots']}")
+    log.info(f"  • Unique properties: {stats['unique_properties']}")
+    log.info(f"  • Average price: {stats['average_price']}")
+    log.info(f"  • Properties with price changes: {stats['properties_with_price_changes']}")
+    log.info("=" * 80)
+
+    if own_db:
+        await db.disconnect()
 
 
 if __name__ == "__main__":
@@ -55,12 +55,15 @@ SEARCH_URLS = [
 PAGE_SIZE = 24
 MAX_PAGES = 50  # Maximum pages to scrape per search URL
 
+# Enabled searches, filtered once at import
+_ENABLED_URLS = [search for search in SEARCH_URLS if search.get("enabled", True)]
+
 
 def get_enabled_urls():
     """Get all enabled search URLs"""
-    return [search for search in SEARCH_URLS if search.get("enabled", True)]
+    return _ENABLED_URLS
 
 
 def get_url_count():
     """Get count of enabled search URLs"""
-    return len(get_enabled_urls())
+    return len(_ENABLED_URLS)
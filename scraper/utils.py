@@ -1,30 +1,76 @@
-async def accept_cookies(page):
-    selectors = [
-        "#onetrust-accept-btn-handler",
-        'button:has-text("Accept")'
-    ]
+import logging
+import sys
+
+# Output goes to stdout like print(); scraper/run.py moves it onto its log
+# queue so it stays in order with the scraper's progress lines
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+if not log.handlers:
+    _log_stream = logging.StreamHandler(sys.stdout)
+    _log_stream.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_log_stream)
+
+# Either accept button, polled together by one locator
+COOKIE_ACCEPT_SELECTOR = '#onetrust-accept-btn-handler, button:has-text("Accept")'
 
+
+async def accept_cookies(page):
     try:
         await page.wait_for_load_state("domcontentloaded")
     except:
         pass
 
-    for selector in selectors:
+    try:
+        await page.locator(COOKIE_ACCEPT_SELECTOR).first.click(timeout=2000)
+        log.info("Cookies accepted (main page)")
+        return
+    except:
+        pass
+
+    # Only consent iframes can hold the banner; skip every other frame
+    for frame in page.frames:
+        if "consent" not in frame.url and "onetrust" not in frame.url:
+            continue
         try:
-            await page.wait_for_selector(selector, timeout=4000)
-            await page.click(selector)
-            print("Cookies accepted (main page)")
+            await frame.locator(COOKIE_ACCEPT_SELECTOR).first.click(timeout=1000)
+            log.info("Cookies accepted (iframe)")
             return
         except:
             pass
 
-        for frame in page.frames:
-            try:
-                await frame.wait_for_selector(selector, timeout=2000)
-                await frame.click(selector)
-                print("Cookies accepted (iframe)")
-                return
-            except:
-                pass
+    log.info("Cookie banner not found or already accepted")
+
+
+# Resource types the scraper never looks at: images are read from their
+# URLs in the markup, not rendered. Stylesheets are kept because
+# extraction relies on innerText, which depends on what CSS hides.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Analytics/tracking hosts, blocked whatever the resource type
+BLOCKED_URL_PARTS = ("google-analytics", "googletagmanager", "doubleclick", "hotjar", "optimizely")
+
+
+async def _abort_blocked_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# Fail fast on stuck pages instead of Playwright's 30 s default, so one slow
+# page can't hold an extraction worker
+NAVIGATION_TIMEOUT_MS = 12000
+ACTION_TIMEOUT_MS = 8000
+
+
+def set_strict_timeouts(target):
+    """Apply the scraper's navigation/action timeouts to a page or browser context"""
+    target.set_default_navigation_timeout(NAVIGATION_TIMEOUT_MS)
+    target.set_default_timeout(ACTION_TIMEOUT_MS)
+
 
-    print("Cookie banner not found or already accepted")
+async def block_heavy_resources(target):
+    """Stop a page or browser context downloading images, video, fonts and trackers (install once)"""
+    await target.route("**/*", _abort_blocked_resources)
@@ -36,29 +36,21 @@ async def main():
     print("=" * 80)
 
     async with db.pool.acquire() as conn:
-        total = await conn.fetchval("SELECT COUNT(DISTINCT property_id) FROM properties")
-        with_postcode = await conn.fetchval("""
-            SELECT COUNT(DISTINCT property_id)
+        # All three counts over the latest snapshots in one pass
+        summary = await conn.fetchrow("""
+            SELECT COUNT(*) AS total,
+                   COUNT(*) FILTER (WHERE postcode IS NOT NULL) AS with_postcode,
+                   COUNT(*) FILTER (WHERE county IS NOT NULL) AS with_county
             FROM (
-                SELECT DISTINCT ON (property_id) property_id, postcode
+                SELECT DISTINCT ON (property_id) property_id, postcode, county
                 FROM properties
                 ORDER BY property_id, created_at DESC
             ) latest
-            WHERE postcode IS NOT NULL
-        """)
-        with_county = await conn.fetchval("""
-            SELECT COUNT(DISTINCT property_id)
-            FROM (
-                SELECT DISTINCT ON (property_id) property_id, county
-                FROM properties
-                ORDER BY property_id, created_at DESC
-            ) latest
-            WHERE county IS NOT NULL
         """)
 
-        print(f"Total unique properties: {total}")
-        print(f"With full postcodes: {with_postcode}")
-        print(f"With county info: {with_county}")
+        print(f"Total unique properties: {summary['total']}")
+        print(f"With full postcodes: {summary['with_postcode']}")
+        print(f"With county info: {summary['with_county']}")
         print("=" * 80)
 
     await db.disconnect()
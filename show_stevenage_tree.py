@@ -60,11 +60,18 @@ async def show_tree():
     """, town['id'])
 
     if orphaned:
+        # Look up all the parents at once
+        parent_ids = [pc['parent_id'] for pc in orphaned if pc['parent_id']]
+        parents = {
+            r['id']: r
+            for r in await conn.fetch("SELECT id, name, place_type FROM places WHERE id = ANY($1::int[])", parent_ids)
+        }
+
         print(f"\n! WARNING: {len(orphaned)} SG postcodes NOT under Stevenage:")
         for pc in orphaned:
             parent_name = "NULL"
             if pc['parent_id']:
-                parent = await conn.fetchrow("SELECT name, place_type FROM places WHERE id = $1", pc['parent_id'])
+                parent = parents.get(pc['parent_id'])
                 if parent:
                     parent_name = f"{parent['name']} ({parent['place_type']})"
             print(f"  {pc['name']} -> parent_id={pc['parent_id']} ({parent_name})")
@@ -81,29 +81,29 @@ async def test_deduplication():
         print("VERIFICATION")
         print("=" * 80)
 
+        # Verification and cleanup share one connection: the DELETE returns the
+        # rows it removes, so the snapshots are read and cleaned up in one query
         async with db.pool.acquire() as conn:
-            snapshots = await conn.fetch("""
-                SELECT price, created_at
-                FROM properties
-                WHERE property_id = 'TEST123456'
-                ORDER BY created_at ASC
-            """)
+            async with conn.transaction():
+                snapshots = await conn.fetch("""
+                    DELETE FROM properties
+                    WHERE property_id = 'TEST123456'
+                    RETURNING price, created_at
+                """)
+        snapshots = sorted(snapshots, key=lambda snap: snap['created_at'])
 
         print(f"\nTotal snapshots for TEST123456: {len(snapshots)}")
         for idx, snap in enumerate(snapshots, 1):
             print(f"  Snapshot {idx}: price=£{snap['price']:,}, created={snap['created_at']}")
 
-        assert len(snapshots) == 2, f"Expected 2 snapshots, got {len(snapshots)}"
-        print("\n[PASS] Correct number of snapshots (2)")
-
-        # Cleanup
         print("\n" + "=" * 80)
         print("CLEANUP")
         print("=" * 80)
-        async with db.pool.acquire() as conn:
-            await conn.execute("DELETE FROM properties WHERE property_id = 'TEST123456'")
         print("Test data deleted")
 
+        assert len(snapshots) == 2, f"Expected 2 snapshots, got {len(snapshots)}"
+        print("\n[PASS] Correct number of snapshots (2)")
+
         print("\n" + "=" * 80)
         print("ALL TESTS PASSED!")
         print("=" * 80)
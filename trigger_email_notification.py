@@ -15,8 +15,8 @@ Usage:
     python trigger_email_notification.py --status <task_id>
 """
 import argparse
-from workers.email_tasks import send_new_snapshots_notification, send_price_alert
-from celery.result import AsyncResult
+# Tasks are sent by name, so the worker task modules (and their database
+# and email dependencies) are never imported by this client
 from workers.celery_app import app
 
 
@@ -44,7 +44,7 @@ def main():
 
     if args.status:
         # Check task status
-        result = AsyncResult(args.status, app=app)
+        result = app.AsyncResult(args.status)
         print(f"\nTask ID: {args.status}")
         print(f"Status: {result.state}")
 
@@ -62,7 +62,10 @@ def main():
         print(f"\nTriggering price alert for property {property_id}...")
         print(f"Price change: £{old_price} → £{new_price}")
 
-        task = send_price_alert.delay(property_id, int(old_price), int(new_price))
+        task = app.send_task(
+            'workers.email_tasks.send_price_alert',
+            args=(property_id, int(old_price), int(new_price))
+        )
         print(f"\nTask ID: {task.id}")
         print(f"Status: {task.state}")
         print(f"\nTo check status, run:")
@@ -72,7 +75,10 @@ def main():
         # Send new snapshots notification
         print(f"\nTriggering email notification for snapshots in the last {args.minutes} minutes...")
 
-        task = send_new_snapshots_notification.delay(args.minutes)
+        task = app.send_task(
+            'workers.email_tasks.send_new_snapshots_notification',
+            args=(args.minutes,)
+        )
         print(f"\nTask ID: {task.id}")
         print(f"Status: {task.state}")
         print(f"\nTo check status, run:")
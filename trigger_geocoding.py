@@ -13,8 +13,8 @@ Usage:
 """
 import argparse
 import sys
-from workers.geocoding import reverse_geocode_missing_postcodes, reverse_geocode_single
-from celery.result import AsyncResult
+# Tasks are sent by name, so the worker task modules (and their database
+# and HTTP dependencies) are never imported by this client
 from workers.celery_app import app
 
 
@@ -35,7 +35,7 @@ def main():
 
     if args.status:
         # Check task status
-        result = AsyncResult(args.status, app=app)
+        result = app.AsyncResult(args.status)
         print(f"\nTask ID: {args.status}")
         print(f"Status: {result.state}")
 
@@ -57,7 +57,7 @@ def main():
         # Geocode all properties with missing data
         print("\nTriggering reverse geocoding for properties with missing data...")
         print("(This includes properties with partial/null postcodes OR null county)")
-        task = reverse_geocode_missing_postcodes.delay()
+        task = app.send_task('workers.geocoding.reverse_geocode_missing_postcodes')
         print(f"\nTask ID: {task.id}")
         print(f"Status: {task.state}")
         print(f"\nTo check status, run:")
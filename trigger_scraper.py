@@ -15,8 +15,8 @@ Usage:
     python trigger_scraper.py --status <task_id>
 """
 import argparse
-from workers.scraper_tasks import run_scraper
-from celery.result import AsyncResult
+# Tasks are sent by name, so the worker task modules (and their scraper,
+# database and HTTP dependencies) are never imported by this client
 from workers.celery_app import app
 
 
@@ -32,7 +32,7 @@ def main():
 
     if args.status:
         # Check task status
-        result = AsyncResult(args.status, app=app)
+        result = app.AsyncResult(args.status)
         print(f"\nTask ID: {args.status}")
         print(f"Status: {result.state}")
 
@@ -55,7 +55,7 @@ def main():
         print("  4. Automatically run reverse geocoding")
         print("=" * 60)
 
-        task = run_scraper.delay()
+        task = app.send_task('workers.scraper_tasks.run_scraper')
         print(f"\nTask ID: {task.id}")
         print(f"Status: {task.state}")
         print(f"\nTo check status, run:")
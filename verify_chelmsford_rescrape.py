@@ -7,15 +7,14 @@ This script checks the results of the Chelmsford re-scrape to verify:
 3. Browser restart logic worked as expected
 """
 import asyncio
-import asyncpg
-from db.config import DB_CONFIG
-from datetime import datetime, timedelta
+from db.connect import get_pool, close_pool
+from datetime import datetime, timedelta, timezone
 
 
 async def verify_rescrape():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    pool = await get_pool()
 
-    try:
+    async with pool.acquire() as conn:
         print("=" * 80)
         print("CHELMSFORD RE-SCRAPE VERIFICATION")
         print("=" * 80)
@@ -24,20 +23,39 @@ async def verify_rescrape():
         now = datetime.now()
         print(f"\nCurrent time: {now.strftime('%Y-%m-%d %H:%M:%S')}")
 
-        # Get Chelmsford properties added in last 12 hours
-        recent_chelmsford = await conn.fetch("""
+        # Start of the "recent" window, bound as a parameter so the SQL text
+        # never changes and its prepared statement can be reused
+        recent_since = datetime.now(timezone.utc) - timedelta(hours=12)
+
+        # Resolve the Chelmsford town IDs once; every query below then
+        # filters properties by town_id directly, without a join
+        chelmsford_ids = [
+            r['id'] for r in await conn.fetch("SELECT id FROM towns WHERE name ILIKE '%chelmsford%'")
+        ]
+
+        # All Chelmsford counts in one round-trip: properties added in the last
+        # 12 hours, unique properties and total snapshots. The unique count is
+        # its own DISTINCT subquery so it can be answered from the
+        # (town_id, property_id) index alone
+        row = await conn.fetchrow("""
             SELECT
-                COUNT(*) as count,
-                MIN(p.created_at) as first_added,
-                MAX(p.created_at) as last_added
+                COUNT(*) FILTER (WHERE p.created_at >= $2::timestamptz) as count,
+                MIN(p.created_at) FILTER (WHERE p.created_at >= $2::timestamptz) as first_added,
+                MAX(p.created_at) FILTER (WHERE p.created_at >= $2::timestamptz) as last_added,
+                (
+                    SELECT COUNT(*)
+                    FROM (
+                        SELECT DISTINCT property_id
+                        FROM properties
+                        WHERE town_id = ANY($1::int[])
+                    ) s
+                ) as total_properties,
+                COUNT(*) as total_snapshots
             FROM properties p
-            LEFT JOIN towns t ON p.town_id = t.id
-            WHERE t.name ILIKE '%chelmsford%'
-            AND p.created_at >= NOW() - INTERVAL '12 hours'
-        """)
+            WHERE p.town_id = ANY($1::int[])
+        """, chelmsford_ids, recent_since)
 
-        if recent_chelmsford and recent_chelmsford[0]['count'] > 0:
-            row = recent_chelmsford[0]
+        if row['count'] > 0:
             print(f"\n[INFO] Found {row['count']} Chelmsford properties added in last 12 hours")
             print(f"  First added: {row['first_added']}")
             print(f"  Last added:  {row['last_added']}")
@@ -55,23 +73,10 @@ async def verify_rescrape():
         print("TOTAL CHELMSFORD PROPERTIES")
         print("-" * 80)
 
-        total_chelmsford = await conn.fetchval("""
-            SELECT COUNT(DISTINCT p.property_id)
-            FROM properties p
-            LEFT JOIN towns t ON p.town_id = t.id
-            WHERE t.name ILIKE '%chelmsford%'
-        """)
+        total_chelmsford = row['total_properties']
+        total_snapshots = row['total_snapshots']
 
         print(f"\nTotal unique Chelmsford properties: {total_chelmsford}")
-
-        # Get snapshot count for comparison
-        total_snapshots = await conn.fetchval("""
-            SELECT COUNT(*)
-            FROM properties p
-            LEFT JOIN towns t ON p.town_id = t.id
-            WHERE t.name ILIKE '%chelmsford%'
-        """)
-
         print(f"Total Chelmsford snapshots: {total_snapshots}")
 
         # Expected vs Actual
@@ -104,28 +109,31 @@ async def verify_rescrape():
         print("RECENT CHELMSFORD PROPERTIES (Last 10)")
         print("-" * 80)
 
-        recent_props = await conn.fetch("""
-            SELECT
-                p.property_id,
-                p.price,
-                p.bedrooms,
-                p.created_at
-            FROM properties p
-            LEFT JOIN towns t ON p.town_id = t.id
-            WHERE t.name ILIKE '%chelmsford%'
-            ORDER BY p.created_at DESC
-            LIMIT 10
-        """)
-
-        for prop in recent_props:
-            print(f"\n  {prop['property_id']}: {prop['bedrooms']}bed, £{prop['price']:,}")
-            print(f"    Added: {prop['created_at']}")
+        # Stream rows and print as they are decoded (cursors need a transaction)
+        async with conn.transaction():
+            async for prop in conn.cursor("""
+                SELECT
+                    p.property_id,
+                    p.price,
+                    p.bedrooms,
+                    p.created_at
+                FROM properties p
+                WHERE p.town_id = ANY($1::int[])
+                ORDER BY p.created_at DESC
+                LIMIT 10
+            """, chelmsford_ids, prefetch=64):
+                print(f"\n  {prop['property_id']}: {prop['bedrooms']}bed, £{prop['price']:,}")
+                print(f"    Added: {prop['created_at']}")
 
         print("\n" + "=" * 80)
 
+
+async def main():
+    try:
+        await verify_rescrape()
     finally:
-        await conn.close()
+        await close_pool()
 
 
 if __name__ == "__main__":
-    asyncio.run(verify_rescrape())
+    asyncio.run(main())
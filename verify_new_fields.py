@@ -1,13 +1,13 @@
 """Verify new property fields are in database"""
 import asyncio
-import asyncpg
-from db.config import DB_CONFIG
+from db.connect import get_pool, close_pool
 
 
 async def verify():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    """Run the check on the shared pool (see db/connect.py)"""
+    pool = await get_pool()
 
-    cols = await conn.fetch("""
+    cols = await pool.fetch("""
         SELECT column_name, data_type
         FROM information_schema.columns
         WHERE table_name='properties'
@@ -19,8 +19,13 @@ async def verify():
     for col in cols:
         print(f"  - {col['column_name']}: {col['data_type']}")
 
-    await conn.close()
+
+async def main():
+    try:
+        await verify()
+    finally:
+        await close_pool()
 
 
 if __name__ == "__main__":
-    asyncio.run(verify())
+    asyncio.run(main())
@@ -1,13 +1,13 @@
 """Verify size column is INTEGER"""
 import asyncio
-import asyncpg
-from db.config import DB_CONFIG
+from db.connect import get_pool, close_pool
 
 
 async def verify():
-    conn = await asyncpg.connect(**DB_CONFIG)
+    """Run the check on the shared pool (see db/connect.py)"""
+    pool = await get_pool()
 
-    result = await conn.fetch("""
+    result = await pool.fetch("""
         SELECT column_name, data_type
         FROM information_schema.columns
         WHERE table_name='properties' AND column_name='size'
@@ -19,8 +19,13 @@ async def verify():
     else:
         print("\nSize column not found!")
 
-    await conn.close()
+
+async def main():
+    try:
+        await verify()
+    finally:
+        await close_pool()
 
 
 if __name__ == "__main__":
-    asyncio.run(verify())
+    asyncio.run(main())
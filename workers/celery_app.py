@@ -7,17 +7,36 @@ import os
 # Redis URL for broker and backend
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 
-# Create Celery app
-app = Celery(
-    'workers',
-    broker=REDIS_URL,
-    backend=REDIS_URL,
-    include=[
+# Path to the Redis UNIX socket, when Redis runs on the same host; used
+# instead of REDIS_URL to skip TCP loopback (database 0)
+REDIS_SOCKET = os.getenv('REDIS_SOCKET')
+if REDIS_SOCKET:
+    REDIS_URL = f'redis+socket://{REDIS_SOCKET}'
+
+# Per-worker cap on each email-sending task, so a burst of notifications
+# can't trip the SMTP/SendGrid provider's own throttling
+EMAIL_RATE_LIMIT = '100/s'
+
+# Task modules are only imported by workers (CELERY_WORKER=1, set by
+# run_workers.py and the Docker image); clients such as the trigger_*.py
+# scripts queue tasks by name with app.send_task() and skip pulling in
+# playwright/sendgrid/etc.
+if os.getenv('CELERY_WORKER'):
+    TASK_MODULES = [
         'workers.geocoding',
         'workers.scraper_tasks',
         'workers.email_tasks',
         'workers.image_tasks',
     ]
+else:
+    TASK_MODULES = []
+
+# Create Celery app
+app = Celery(
+    'workers',
+    broker=REDIS_URL,
+    backend=REDIS_URL,
+    include=TASK_MODULES
 )
 
 # Celery configuration
@@ -36,16 +55,33 @@ app.conf.update(
         'workers.image_tasks.*': {'queue': 'scraper'},
     },
 
+    # Annotations match exact task names (no wildcards), so each
+    # email-sending task is listed
+    task_annotations={
+        'workers.email_tasks.send_email': {'rate_limit': EMAIL_RATE_LIMIT},
+        'workers.email_tasks.send_new_snapshots_notification': {'rate_limit': EMAIL_RATE_LIMIT},
+        'workers.email_tasks.send_price_alert': {'rate_limit': EMAIL_RATE_LIMIT},
+    },
+
     # Task execution settings
+    # Acked after they run, so a task a worker never started is redelivered;
+    # a task whose worker died mid-run (e.g. killed at the time limit) is not
+    # re-queued, so one bad page can't loop forever
     task_acks_late=True,
-    task_reject_on_worker_lost=True,
     worker_prefetch_multiplier=1,
 
+    # Unacked tasks return to the queue after this long; must exceed the
+    # longest task, and scrapes (no time limit, see run_workers.TIME_LIMITS)
+    # can run for hours
+    broker_transport_options={'visibility_timeout': 43200},
+
     # Retry settings
     task_default_retry_delay=60,  # 1 minute
     task_max_retries=3,
 
     # Result backend settings
+    # Results are stored by default (the trigger_*.py scripts check them with
+    # --status); fire-and-forget tasks opt out with @app.task(ignore_result=True)
     result_expires=3600,  # 1 hour
 )
 
@@ -8,14 +8,19 @@ Supports multiple email services with automatic fallback:
 """
 import asyncio
 import asyncpg
+import atexit
+import httpx
 import smtplib
+import threading
+import time
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import List, Dict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from celery.signals import worker_process_shutdown, worker_shutdown
 
 try:
-    from sendgrid import SendGridAPIClient
     from sendgrid.helpers.mail import Mail, Email, To, Content
     SENDGRID_AVAILABLE = True
 except ImportError:
@@ -38,6 +43,229 @@ from workers.email_config import (
 from db.config import DB_CONFIG
 
 
+# Per worker process: one event loop running in a background thread, with a
+# database pool bound to it. Both are created by the first task that queries
+# the database and reused by every later one, so tasks skip the connection
+# handshake and event loop setup; concurrent tasks (greenlets) share them.
+_loop = None
+_loop_thread = None
+_pool = None
+_loop_lock = threading.Lock()
+
+
+def _run_async(coro):
+    """Run a coroutine on this process's database event loop and return its result"""
+    global _loop, _loop_thread, _pool
+
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='email-db-loop', daemon=True)
+            thread.start()
+            try:
+                _pool = asyncio.run_coroutine_threadsafe(
+                    asyncpg.create_pool(**DB_CONFIG, min_size=1, max_size=4), loop
+                ).result()
+            except Exception:
+                # Don't leave a loop thread behind; the next task retries
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            _loop, _loop_thread = loop, thread
+            print("[EMAIL WORKER] Database pool opened")
+
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _shutdown_email_resources(**kwargs):
+    """Close the database pool and stop its event loop when the worker exits"""
+    global _loop, _loop_thread, _pool
+
+    with _loop_lock:
+        if _loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(_pool.close(), _loop).result(timeout=10)
+        except Exception as e:
+            print(f"[EMAIL WORKER] Failed to close database pool: {e}")
+        _loop.call_soon_threadsafe(_loop.stop)
+        _loop_thread.join()
+        _loop.close()
+        _loop = _loop_thread = _pool = None
+
+
+# One HTTP client per process for the SendGrid API, so sends reuse a warm
+# keep-alive TLS connection instead of handshaking each time
+SENDGRID_SEND_URL = 'https://api.sendgrid.com/v3/mail/send'
+_sg_client = None
+
+
+def _get_sg_client() -> httpx.Client:
+    """Return this process's SendGrid HTTP client, creating it on first use"""
+    global _sg_client
+
+    if _sg_client is None:
+        _sg_client = httpx.Client(
+            timeout=10.0,
+            headers={'Authorization': f'Bearer {SENDGRID_API_KEY}'}
+        )
+    return _sg_client
+
+
+@atexit.register
+def _close_sg_client():
+    """Close the SendGrid HTTP client's connections when the process exits"""
+    if _sg_client is not None:
+        _sg_client.close()
+
+
+# Logged-in SMTP sessions kept open between sends, so bursts of notifications
+# skip the TCP + TLS + AUTH handshake. Idle sessions are pooled per
+# (host, port, username) as (server, opened_at, messages_sent) and retired
+# once they reach either limit below.
+SMTP_MAX_AGE = 100        # seconds
+SMTP_MAX_MESSAGES = 100   # messages per session
+_SMTP_POOL = {}
+_SMTP_LOCK = threading.Lock()
+
+
+class PipeliningSMTP(smtplib.SMTP):
+    """
+    SMTP client that pipelines the envelope (RFC 2920)
+
+    When the server advertises PIPELINING, MAIL FROM, every RCPT TO and DATA
+    are written back-to-back and their replies read afterwards, so a message
+    costs about one round-trip before the body instead of one per recipient
+    plus two. Falls back to smtplib's command-by-command sendmail otherwise.
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn('pipelining') or mail_options or rcpt_options:
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode('ascii')
+
+        # Write the whole envelope before reading any reply
+        self.putcmd('mail', f'FROM:{smtplib.quoteaddr(from_addr)}')
+        for to_addr in to_addrs:
+            self.putcmd('rcpt', f'TO:{smtplib.quoteaddr(to_addr)}')
+        self.putcmd('data')
+
+        # Replies come back in command order
+        mail_code, mail_resp = self.getreply()
+        senderrs = {}
+        for to_addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                senderrs[to_addr] = (code, resp)
+        data_code, data_resp = self.getreply()
+
+        if data_code == 354 and (mail_code != 250 or len(senderrs) == len(to_addrs)):
+            # Server accepted DATA without a valid envelope; end it empty
+            self.send(b'.' + smtplib.bCRLF)
+            self.getreply()
+            data_code = None
+
+        if mail_code != 250:
+            self._rset()
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(senderrs) == len(to_addrs):
+            self._rset()
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        if data_code != 354:
+            self._rset()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+
+        # Message body, same framing as smtplib.SMTP.data()
+        q = smtplib._quote_periods(msg)
+        if q[-2:] != smtplib.bCRLF:
+            q = q + smtplib.bCRLF
+        q = q + b'.' + smtplib.bCRLF
+        self.send(q)
+        code, resp = self.getreply()
+        if code != 250:
+            self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+
+        return senderrs
+
+
+def _open_smtp_connection(smtp_provider: str) -> smtplib.SMTP:
+    """Connect, upgrade to TLS (if enabled) and log in to the configured SMTP server"""
+    print(f"[EMAIL-{smtp_provider}] Connecting to {SMTP_HOST}:{SMTP_PORT}")
+    server = PipeliningSMTP(SMTP_HOST, SMTP_PORT)
+    try:
+        if SMTP_USE_TLS:
+            server.starttls()
+        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _quit_smtp_connection(server: smtplib.SMTP):
+    """Say goodbye to the server, dropping the socket even if it is already gone"""
+    try:
+        server.quit()
+    except Exception:
+        server.close()
+
+
+def _get_smtp_connection(smtp_provider: str) -> tuple:
+    """
+    Take a live SMTP session for the configured server
+
+    Reuses an idle pooled session if it is young enough, has sent fewer than
+    SMTP_MAX_MESSAGES and answers a NOOP; otherwise opens a new one.
+
+    Returns:
+        (server, opened_at, messages_sent), to be handed back with
+        _release_smtp_connection() after sending
+    """
+    key = (SMTP_HOST, SMTP_PORT, SMTP_USERNAME)
+    with _SMTP_LOCK:
+        idle = _SMTP_POOL.get(key)
+        entry = idle.pop() if idle else None
+
+    if entry is not None:
+        server, opened_at, messages_sent = entry
+        if (time.monotonic() - opened_at < SMTP_MAX_AGE
+                and messages_sent < SMTP_MAX_MESSAGES):
+            try:
+                if server.noop()[0] == 250:
+                    return entry
+            except (smtplib.SMTPException, OSError):
+                pass
+        _quit_smtp_connection(server)
+
+    return _open_smtp_connection(smtp_provider), time.monotonic(), 0
+
+
+def _release_smtp_connection(entry: tuple):
+    """Return a session taken with _get_smtp_connection() to the idle pool"""
+    key = (SMTP_HOST, SMTP_PORT, SMTP_USERNAME)
+    with _SMTP_LOCK:
+        _SMTP_POOL.setdefault(key, []).append(entry)
+
+
+@atexit.register
+def _close_smtp_connections():
+    """Quit every pooled SMTP session when the worker process exits"""
+    with _SMTP_LOCK:
+        entries = [entry for idle in _SMTP_POOL.values() for entry in idle]
+        _SMTP_POOL.clear()
+    for server, _, _ in entries:
+        _quit_smtp_connection(server)
+
+
 def send_email_via_sendgrid(to_emails: List[str], subject: str, html_content: str) -> dict:
     """
     Send email using SendGrid API
@@ -70,8 +298,9 @@ def send_email_via_sendgrid(to_emails: List[str], subject: str, html_content: st
             html_content=Content("text/html", html_content)
         )
 
-        sg = SendGridAPIClient(SENDGRID_API_KEY)
-        response = sg.send(message)
+        # The SDK builds the request body; it is posted on the shared client
+        response = _get_sg_client().post(SENDGRID_SEND_URL, json=message.get())
+        response.raise_for_status()
 
         print(f"[EMAIL-SENDGRID] Sent to {len(to_emails)} recipients: {subject}")
         print(f"[EMAIL-SENDGRID] Status code: {response.status_code}")
@@ -129,17 +358,15 @@ def send_email_via_smtp(to_emails: List[str], subject: str, html_content: str) -
         html_part = MIMEText(html_content, 'html')
         msg.attach(html_part)
 
-        # Connect to SMTP server
-        print(f"[EMAIL-{smtp_provider}] Connecting to {SMTP_HOST}:{SMTP_PORT}")
-        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
-
-        if SMTP_USE_TLS:
-            server.starttls()
-
-        # Login and send
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.sendmail(SMTP_USERNAME, to_emails, msg.as_string())
-        server.quit()
+        # Take a logged-in session (pooled, or freshly connected) and send
+        server, opened_at, messages_sent = _get_smtp_connection(smtp_provider)
+        try:
+            server.sendmail(SMTP_USERNAME, to_emails, msg.as_string())
+        except Exception:
+            # The session may be mid-transaction; don't hand it to the next send
+            _quit_smtp_connection(server)
+            raise
+        _release_smtp_connection((server, opened_at, messages_sent + 1))
 
         print(f"[EMAIL-{smtp_provider}] Sent to {len(to_emails)} recipients: {subject}")
 
@@ -213,30 +440,49 @@ def format_property_html(property_data: dict) -> str:
     Returns:
         HTML string
     """
-    price_str = f"£{property_data['price']:,}" if property_data['price'] else "Price not available"
-    bedrooms_str = f"{property_data['bedrooms']} bed" if property_data['bedrooms'] else "Bedrooms N/A"
-    property_type = property_data.get('property_type') or 'Unknown type'
-    offer_type = property_data.get('offer_type') or ''
-    county = property_data.get('county') or ''
-    postcode = property_data.get('postcode') or ''
+    return format_property_html_cached(
+        property_data['property_id'],
+        property_data['url'],
+        property_data['price'],
+        property_data['bedrooms'],
+        property_data.get('property_type'),
+        property_data.get('offer_type'),
+        property_data.get('county'),
+        property_data.get('postcode'),
+        property_data['created_at'].strftime('%Y-%m-%d %H:%M')
+    )
+
+
+# Snapshots in overlapping digest windows (hourly + daily) render to the same
+# HTML, so results are memoized on the (hashable) fields that go into them
+@lru_cache(maxsize=4096)
+def format_property_html_cached(property_id: str, url: str, price, bedrooms, property_type,
+                                offer_type, county, postcode, created_at: str) -> str:
+    """Render one property's HTML block from its fields (created_at pre-formatted)"""
+    price_str = f"£{price:,}" if price else "Price not available"
+    bedrooms_str = f"{bedrooms} bed" if bedrooms else "Bedrooms N/A"
+    property_type = property_type or 'Unknown type'
+    offer_type = offer_type or ''
+    county = county or ''
+    postcode = postcode or ''
 
     location = f"{postcode}, {county}" if postcode and county else (postcode or county or "Location N/A")
 
     return f"""
     <div style="border: 1px solid #ddd; padding: 15px; margin-bottom: 15px; border-radius: 5px;">
         <h3 style="margin-top: 0;">
-            <a href="{property_data['url']}" style="color: #0066cc; text-decoration: none;">
+            <a href="{url}" style="color: #0066cc; text-decoration: none;">
                 {price_str} - {bedrooms_str} {property_type}
             </a>
         </h3>
         <p style="margin: 5px 0;">
-            <strong>Property ID:</strong> {property_data['property_id']}<br>
+            <strong>Property ID:</strong> {property_id}<br>
             <strong>Type:</strong> {offer_type} {property_type}<br>
             <strong>Location:</strong> {location}<br>
-            <strong>Snapshot Date:</strong> {property_data['created_at'].strftime('%Y-%m-%d %H:%M')}<br>
+            <strong>Snapshot Date:</strong> {created_at}<br>
         </p>
         <p style="margin: 10px 0 0 0;">
-            <a href="{property_data['url']}"
+            <a href="{url}"
                style="background-color: #0066cc; color: white; padding: 8px 16px;
                       text-decoration: none; border-radius: 3px; display: inline-block;">
                 View on the third-party property listing portal
@@ -246,7 +492,27 @@ def format_property_html(property_data: dict) -> str:
     """
 
 
-@app.task(name='workers.email_tasks.send_email')
+# Fixed parts of the new-snapshots email, shared by every notification
+_SNAPSHOTS_EMAIL_HEAD = """
+    <html>
+    <head>
+        <style>
+            body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+            .header { background-color: #0066cc; color: white; padding: 20px; text-align: center; }
+            .content { padding: 20px; }
+            .footer { background-color: #f5f5f5; padding: 15px; text-align: center; font-size: 12px; color: #666; }
+        </style>
+    </head>
+    <body>
+"""
+
+_EMAIL_END = """
+    </body>
+    </html>
+"""
+
+
+@app.task(name='workers.email_tasks.send_email', ignore_result=True)
 def send_email(to: str, subject: str, body: str):
     """
     Send a basic email.
@@ -269,9 +535,7 @@ def send_new_snapshots_notification(minutes: int = 60):
         minutes: Look for snapshots added in the last N minutes (default: 60)
     """
     async def _get_new_snapshots():
-        conn = await asyncpg.connect(**DB_CONFIG)
-
-        try:
+        async with _pool.acquire() as conn:
             # Get snapshots added in the last N minutes
             cutoff_time = datetime.now() - timedelta(minutes=minutes)
 
@@ -297,19 +561,8 @@ def send_new_snapshots_notification(minutes: int = 60):
 
             return [dict(p) for p in properties]
 
-        finally:
-            await conn.close()
-
     # Get new snapshots
-    try:
-        new_snapshots = asyncio.run(_get_new_snapshots())
-    except RuntimeError as e:
-        if "This event loop is already running" in str(e):
-            import nest_asyncio
-            nest_asyncio.apply()
-            new_snapshots = asyncio.run(_get_new_snapshots())
-        else:
-            raise
+    new_snapshots = _run_async(_get_new_snapshots())
 
     if not new_snapshots:
         print(f"[EMAIL] No new snapshots in the last {minutes} minutes")
@@ -324,33 +577,25 @@ def send_new_snapshots_notification(minutes: int = 60):
 
     properties_html = "".join([format_property_html(prop) for prop in new_snapshots])
 
-    html_content = f"""
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .header {{ background-color: #0066cc; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 20px; }}
-            .footer {{ background-color: #f5f5f5; padding: 15px; text-align: center; font-size: 12px; color: #666; }}
-        </style>
-    </head>
-    <body>
+    header_html = f"""
         <div class="header">
             <h1>New Property Snapshots</h1>
             <p>{len(new_snapshots)} new properties added in the last {minutes} minutes</p>
         </div>
         <div class="content">
             <p>Here are the latest property snapshots from your scraper:</p>
-            {properties_html}
+    """
+
+    footer_html = f"""
         </div>
         <div class="footer">
             <p>This is an automated notification from your Property Scraper.</p>
             <p>Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
         </div>
-    </body>
-    </html>
     """
 
+    html_content = "".join([_SNAPSHOTS_EMAIL_HEAD, header_html, properties_html, footer_html, _EMAIL_END])
+
     # Send email
     result = send_email_smart(NOTIFICATION_EMAILS, subject, html_content)
     result['snapshots_count'] = len(new_snapshots)
@@ -373,8 +618,7 @@ def send_price_alert(property_id: str, old_price: int, new_price: int):
         return {"status": "no_recipients"}
 
     async def _get_property_details():
-        conn = await asyncpg.connect(**DB_CONFIG)
-        try:
+        async with _pool.acquire() as conn:
             prop = await conn.fetchrow("""
                 SELECT
                     p.property_id,
@@ -393,18 +637,8 @@ def send_price_alert(property_id: str, old_price: int, new_price: int):
                 LIMIT 1
             """, property_id)
             return dict(prop) if prop else None
-        finally:
-            await conn.close()
 
-    try:
-        property_data = asyncio.run(_get_property_details())
-    except RuntimeError as e:
-        if "This event loop is already running" in str(e):
-            import nest_asyncio
-            nest_asyncio.apply()
-            property_data = asyncio.run(_get_property_details())
-        else:
-            raise
+    property_data = _run_async(_get_property_details())
 
     if not property_data:
         print(f"[EMAIL] Property {property_id} not found")
@@ -455,7 +689,7 @@ def send_price_alert(property_id: str, old_price: int, new_price: int):
     return send_email_smart(NOTIFICATION_EMAILS, subject, html_content)
 
 
-@app.task(name='workers.email_tasks.send_daily_digest')
+@app.task(name='workers.email_tasks.send_daily_digest', ignore_result=True)
 def send_daily_digest():
     """
     Send daily digest of new properties added in the last 24 hours.
@@ -58,6 +58,12 @@ UNITARY_TO_CEREMONIAL_COUNTY = {
     "Rutland": "Rutland",
 }
 
+# Successful reverse geocodes, keyed by coordinates (rounded to ~10cm) so a
+# listing re-scraped or re-queued in the same worker skips the rate-limited
+# API call. Oldest entries are dropped once the cache is full.
+REVERSE_GEOCODE_CACHE_SIZE = 10000
+_reverse_geocode_cache = {}
+
 
 async def get_or_create_place(conn, name: str, place_type: str, parent_id: int = None) -> int:
     """
@@ -153,6 +159,11 @@ async def reverse_geocode(latitude: float, longitude: float) -> dict:
     if not latitude or not longitude:
         return {"postcode": None, "admin_county": None, "admin_ward": None}
 
+    cache_key = (round(latitude, 6), round(longitude, 6))
+    cached = _reverse_geocode_cache.get(cache_key)
+    if cached:
+        return dict(cached)
+
     try:
         url = f"https://api.postcodes.io/postcodes?lat={latitude}&lon={longitude}"
 
@@ -182,11 +193,17 @@ async def reverse_geocode(latitude: float, longitude: float) -> dict:
                             else:
                                 county = admin_district
 
-                            return {
+                            details = {
                                 "postcode": nearest.get('postcode'),
                                 "admin_county": county,
                                 "admin_ward": nearest.get('admin_ward')
                             }
+
+                            if len(_reverse_geocode_cache) >= REVERSE_GEOCODE_CACHE_SIZE:
+                                del _reverse_geocode_cache[next(iter(_reverse_geocode_cache))]
+                            _reverse_geocode_cache[cache_key] = details
+
+                            return dict(details)
                 else:
                     print(f"[GEOCODING] Failed for coordinates ({latitude}, {longitude}): HTTP {response.status}")
 
@@ -497,7 +514,7 @@ def reverse_geocode_single(latitude: float, longitude: float):
         raise
 
 
-@app.task(name='workers.geocoding.schedule_reverse_geocoding')
+@app.task(name='workers.geocoding.schedule_reverse_geocoding', ignore_result=True)
 def schedule_reverse_geocoding():
     """
     Periodic task to check for and reverse geocode properties with missing postcodes.
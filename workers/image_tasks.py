@@ -11,7 +11,7 @@ import json
 from db.config import DB_CONFIG
 
 
-@app.task(bind=True, max_retries=3, queue='scraper')
+@app.task(bind=True, max_retries=3, queue='scraper', ignore_result=True)
 def download_property_images(self, property_id: str, image_urls: list):
     """
     Download images from source URLs and upload to MinIO
@@ -2,10 +2,76 @@
 Scraper worker tasks - Run third-party property listing portal scraper with automatic geocoding
 """
 import asyncio
+from celery.signals import worker_process_shutdown
 from workers.celery_app import app
 from workers.geocoding import reverse_geocode_missing_postcodes
 
 
+# Per worker process: one event loop that stays open between tasks, with the
+# Playwright browser and database pool bound to it. They are created by the
+# first scrape and reused by every later one, so runs skip the browser launch,
+# pool setup and schema check.
+_loop = None
+_playwright = None
+_browser = None
+_db = None
+
+
+async def _get_scraper_resources():
+    """Return this process's (db, browser), opening whichever isn't open yet"""
+    global _playwright, _browser, _db
+
+    if _db is None:
+        from db.database import DatabaseConnector
+        from db.config import DB_CONFIG
+
+        db = DatabaseConnector()
+        await db.connect(**DB_CONFIG)
+        await db.init_schema()
+        _db = db
+        print("[SCRAPER WORKER] Database pool opened")
+
+    if _browser is None or not _browser.is_connected():
+        if _playwright is None:
+            from playwright.async_api import async_playwright
+            _playwright = await async_playwright().start()
+        # headless=True is required for running in containers without display
+        _browser = await _playwright.chromium.launch(headless=True)
+        print("[SCRAPER WORKER] Browser launched")
+
+    return _db, _browser
+
+
+async def _close_scraper_resources():
+    """Close the browser, Playwright and database pool of this process"""
+    global _playwright, _browser, _db
+
+    if _browser is not None:
+        await _browser.close()
+        _browser = None
+    if _playwright is not None:
+        await _playwright.stop()
+        _playwright = None
+    if _db is not None:
+        await _db.disconnect()
+        _db = None
+
+
+@worker_process_shutdown.connect
+def _shutdown_scraper_resources(**kwargs):
+    """Release the cached browser and pool when a worker process exits"""
+    global _loop
+
+    if _loop is None:
+        return
+    try:
+        _loop.run_until_complete(_close_scraper_resources())
+    except Exception as e:
+        print(f"[SCRAPER WORKER] Failed to close scraper resources: {e}")
+    _loop.close()
+    _loop = None
+
+
 @app.task(name='workers.scraper_tasks.run_scraper', bind=True)
 def run_scraper(self):
     """
@@ -21,6 +87,8 @@ def run_scraper(self):
             - total_errors: Errors encountered
             - geocoding_task_id: ID of the geocoding task triggered
     """
+    global _loop
+
     print("[SCRAPER WORKER] Starting third-party property listing portal scraper...")
 
     async def _run_scraper():
@@ -29,8 +97,9 @@ def run_scraper(self):
         from scraper.run import main as scraper_main
 
         try:
-            # Run the scraper
-            await scraper_main()
+            # Run the scraper on this process's long-lived browser and pool
+            db, browser = await _get_scraper_resources()
+            await scraper_main(db=db, browser=browser)
 
             print("[SCRAPER WORKER] Scraping completed successfully")
             return {"status": "success"}
@@ -41,17 +110,12 @@ def run_scraper(self):
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
-    # Run the async scraper function
-    try:
-        result = asyncio.run(_run_scraper())
-    except RuntimeError as e:
-        if "This event loop is already running" in str(e):
-            # If running inside an existing event loop (Celery), use nest_asyncio
-            import nest_asyncio
-            nest_asyncio.apply()
-            result = asyncio.run(_run_scraper())
-        else:
-            raise
+    # Run the async scraper function on the process's persistent event loop
+    # (the cached browser and pool only work on the loop they were opened on)
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    result = _loop.run_until_complete(_run_scraper())
 
     if result["status"] == "success":
         # Trigger reverse geocoding for any new properties
@@ -73,7 +137,7 @@ def run_scraper(self):
         }
 
 
-@app.task(name='workers.scraper_tasks.schedule_scraper')
+@app.task(name='workers.scraper_tasks.schedule_scraper', ignore_result=True)
 def schedule_scraper():
     """
     Periodic task to run scraper on a schedule.